@@ -9,6 +9,8 @@ from .chat import router as chat_router
 from .grades import router as grades_router
 from .calendar import router as calendar_router
 from .notifications import router as notifications_router
+from .metrics import router as metrics_router
+from .well_known import router as well_known_router
 
 __all__ = [
     "health_router",
@@ -22,4 +24,6 @@ __all__ = [
     "grades_router",
     "calendar_router",
     "notifications_router",
+    "metrics_router",
+    "well_known_router",
 ]
@@ -4,9 +4,13 @@ from uuid import UUID
 from typing import Optional, List
 from datetime import datetime
 
-from app.db.session import get_session
-from app.db.models import User, AssignmentStatus, Submission, SubmissionFile
+from app.core.rate_limit import rate_limit
+from app.core.settings import settings
+from app.db.session import get_session, get_read_session
+from app.db.query_stats import query_budget
+from app.db.models import AssignmentStatus, Submission, SubmissionFile
 from app.utils.deps import get_current_user
+from app.services.user_cache import UserSnapshot
 from app.repo.assignment import AssignmentRepository, SubmissionRepository
 from app.repo.course import StudentCourseRepository
 # from app.services.s3_service import s3_service  # Отключено
@@ -25,11 +29,15 @@ router = APIRouter(
 )
 
 
-@router.get("/courses/{course_id}/assignments", response_model=AssignmentsListResponse)
+@router.get(
+    "/courses/{course_id}/assignments",
+    response_model=AssignmentsListResponse,
+    dependencies=[Depends(query_budget(5))]
+)
 async def get_course_assignments(
     course_id: UUID,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    current_user: UserSnapshot = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Получить список заданий по курсу"""
     assignment_repo = AssignmentRepository(session)
@@ -42,12 +50,14 @@ async def get_course_assignments(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not enrolled in this course")
     
     assignments = await assignment_repo.get_by_course(course_id)
+    # Последние отправки по всем заданиям курса одним запросом
+    latest_submissions = await submission_repo.get_latest_by_assignments(
+        [assignment.id for assignment in assignments], current_user.id
+    )
     
     assignments_list = []
     for assignment in assignments:
-        # Получаем последнюю отправку
-        submissions = await submission_repo.get_by_assignment_and_student(assignment.id, current_user.id)
-        latest_submission = submissions[0] if submissions else None
+        latest_submission = latest_submissions.get(assignment.id)
         
         # Определяем статус
         status_value = AssignmentStatus.NOT_STARTED.value
@@ -77,14 +87,15 @@ async def get_course_assignments(
 @router.get("/assignments/{assignment_id}", response_model=AssignmentDetailResponse)
 async def get_assignment_detail(
     assignment_id: UUID,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    current_user: UserSnapshot = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Получить детали задания"""
     assignment_repo = AssignmentRepository(session)
     student_course_repo = StudentCourseRepository(session)
     
-    assignment = await assignment_repo.get_by_id_with_relations(assignment_id)
+    # Связи задания эндпоинту не нужны - только колонки
+    assignment = await assignment_repo.get_by_id(assignment_id)
     if not assignment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assignment not found")
     
@@ -124,8 +135,8 @@ async def get_assignment_detail(
 @router.get("/assignments/{assignment_id}/submissions", response_model=SubmissionsListResponse)
 async def get_submissions(
     assignment_id: UUID,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    current_user: UserSnapshot = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Получить историю отправок задания"""
     assignment_repo = AssignmentRepository(session)
@@ -151,12 +162,15 @@ async def get_submissions(
     )
 
 
-@router.post("/assignments/{assignment_id}/submissions")
+@router.post(
+    "/assignments/{assignment_id}/submissions",
+    dependencies=[Depends(rate_limit("submission", settings.RATE_LIMIT_SUBMISSION, per=("account",)))]
+)
 async def create_submission(
     assignment_id: UUID,
     comment: Optional[str] = Form(None),
     files: List[UploadFile] = File([]),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """Отправить новую версию задания"""
@@ -181,7 +195,8 @@ async def create_submission(
         assignment_id=assignment_id,
         student_id=current_user.id,
         comment=comment,
-        status=AssignmentStatus.SUBMITTED
+        status=AssignmentStatus.SUBMITTED,
+        files=[]  # Коллекция уже "загружена": ответ не пойдет за файлами в БД
     )
     submission = await submission_repo.create(submission)
     
@@ -191,8 +206,5 @@ async def create_submission(
         # Можно добавить логирование, что файлы были проигнорированы
         pass
     
-    await session.commit()
-    await session.refresh(submission)
-    
     return SubmissionResponse.model_validate(submission)
 
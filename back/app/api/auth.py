@@ -1,29 +1,40 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.rate_limit import rate_limit
+from app.core.settings import settings
 from app.db.session import get_session
 from app.services.auth_service import AuthService
 from app.schemas.auth import LoginRequest, SignupRequest, AuthResponse, RefreshTokenRequest, RefreshTokenResponse, UserResponse
-from app.utils.deps import get_current_user
-from app.db.models import User
+from app.utils.deps import get_current_user, get_optional_token_payload
+from app.services.user_cache import UserSnapshot
 
 router = APIRouter(
     prefix="/api/auth",
     tags=["auth"]
 )
 
+# Лимит проверяется до чтения из БД и до bcrypt
+auth_rate_limit = rate_limit("auth", settings.RATE_LIMIT_AUTH, ip_rate=settings.RATE_LIMIT_AUTH_IP)
+# Refresh по таймеру клиента не должен выедать лимит входа - отдельный счетчик по сессии
+refresh_rate_limit = rate_limit(
+    "refresh", settings.RATE_LIMIT_REFRESH, per=("ip", "session"), ip_rate=settings.RATE_LIMIT_REFRESH_IP
+)
+
 
-@router.post("/login", response_model=AuthResponse)
+@router.post("/login", response_model=AuthResponse, dependencies=[Depends(auth_rate_limit)])
 async def login(
     request: LoginRequest,
     session: AsyncSession = Depends(get_session)
 ):
     """Вход в систему"""
     service = AuthService(session)
-    return await service.login(request.email, request.password)
+    return await service.login(request.email, request.password, request.device_id)
 
 
-@router.post("/signup", response_model=AuthResponse)
+@router.post("/signup", response_model=AuthResponse, dependencies=[Depends(auth_rate_limit)])
 async def signup(
     request: SignupRequest,
     session: AsyncSession = Depends(get_session)
@@ -34,19 +45,20 @@ async def signup(
         request.email,
         request.password,
         request.first_name,
-        request.last_name
+        request.last_name,
+        request.device_id
     )
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Получить информацию о текущем пользователе"""
     return UserResponse.model_validate(current_user)
 
 
-@router.post("/refresh", response_model=RefreshTokenResponse)
+@router.post("/refresh", response_model=RefreshTokenResponse, dependencies=[Depends(refresh_rate_limit)])
 async def refresh(
     request: RefreshTokenRequest,
     session: AsyncSession = Depends(get_session)
@@ -55,3 +67,14 @@ async def refresh(
     service = AuthService(session)
     return await service.refresh_token(request.refresh_token)
 
+
+@router.post("/logout")
+async def logout(
+    request: RefreshTokenRequest,
+    access_payload: Optional[dict] = Depends(get_optional_token_payload),
+    session: AsyncSession = Depends(get_session)
+):
+    """Выйти на текущем устройстве (отзывает refresh-сессию и текущий access токен)"""
+    service = AuthService(session)
+    await service.logout(request.refresh_token, access_payload)
+    return {"message": "Logged out successfully"}
@@ -3,9 +3,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from typing import Optional
 
-from app.db.session import get_session
-from app.db.models import User, Message
+from app.core.rate_limit import rate_limit
+from app.core.settings import settings
+from app.db.session import get_session, get_read_session
+from app.db.models import Message
 from app.utils.deps import get_current_user
+from app.services.user_cache import UserSnapshot
 from app.repo.chat import ChatChannelRepository, MessageRepository
 from app.repo.course import StudentCourseRepository
 from app.schemas.chat import (
@@ -25,8 +28,8 @@ router = APIRouter(
 @router.get("/courses/{course_id}/chat/channels", response_model=ChannelsListResponse)
 async def get_course_channels(
     course_id: UUID,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    current_user: UserSnapshot = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Получить список чатов для курса"""
     channel_repo = ChatChannelRepository(session)
@@ -54,10 +57,10 @@ async def get_course_channels(
 @router.get("/chat/channels/{channel_id}/messages", response_model=MessagesListResponse)
 async def get_channel_messages(
     channel_id: UUID,
-    cursor: Optional[UUID] = Query(None),
-    limit: int = Query(50, le=100),
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+    limit: int = Query(50, ge=1, le=100),
+    current_user: UserSnapshot = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Получить сообщения канала"""
     channel_repo = ChatChannelRepository(session)
@@ -76,9 +79,7 @@ async def get_channel_messages(
     if not student_course:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not enrolled in this course")
     
-    messages = await message_repo.get_by_channel(channel_id, cursor, limit)
-    
-    next_cursor = messages[-1].id if messages and len(messages) == limit else None
+    page = await message_repo.get_by_channel(channel_id, cursor, limit)
     
     return MessagesListResponse(
         messages=[MessageResponse(
@@ -87,16 +88,19 @@ async def get_channel_messages(
             sender_id=m.sender_id,
             sender_name=f"{m.sender.first_name or ''} {m.sender.last_name or ''}".strip() or m.sender.email,
             created_at=m.created_at
-        ) for m in reversed(messages)],  # Переворачиваем, чтобы новые были в конце
-        next_cursor=next_cursor
+        ) for m in reversed(page.items)],  # Переворачиваем, чтобы новые были в конце
+        next_cursor=page.next_cursor
     )
 
 
-@router.post("/chat/channels/{channel_id}/messages")
+@router.post(
+    "/chat/channels/{channel_id}/messages",
+    dependencies=[Depends(rate_limit("chat_message", settings.RATE_LIMIT_CHAT_MESSAGE, per=("account",)))]
+)
 async def create_message(
     channel_id: UUID,
     request: MessageCreateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """Отправить сообщение в канал"""
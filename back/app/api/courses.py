@@ -3,9 +3,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from typing import Optional
 
-from app.db.session import get_session
-from app.db.models import User, CourseStatus
+from app.db.session import get_read_session
+from app.db.models import CourseStatus
 from app.utils.deps import get_current_user
+from app.services.user_cache import UserSnapshot
 from app.repo.course import CourseRepository, StudentCourseRepository
 from app.schemas.course import CourseListResponse, CourseListItem, CourseOverviewResponse
 
@@ -18,8 +19,8 @@ router = APIRouter(
 @router.get("/student/courses", response_model=CourseListResponse)
 async def get_student_courses(
     status: Optional[CourseStatus] = Query(None, description="Filter by status"),
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    current_user: UserSnapshot = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Получить список курсов студента"""
     repo = StudentCourseRepository(session)
@@ -44,8 +45,8 @@ async def get_student_courses(
 @router.get("/courses/{course_id}/overview", response_model=CourseOverviewResponse)
 async def get_course_overview(
     course_id: UUID,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    current_user: UserSnapshot = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Получить обзор курса"""
     course_repo = CourseRepository(session)
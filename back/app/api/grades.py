@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.db.session import get_session
-from app.db.models import User
+from app.db.session import get_read_session
+from app.db.query_stats import query_budget
 from app.utils.deps import get_current_user
+from app.services.user_cache import UserSnapshot
 from app.repo.course import CourseRepository, StudentCourseRepository
 from app.repo.assignment import AssignmentRepository, SubmissionRepository
 from app.repo.test import TestRepository, TestAttemptRepository
@@ -16,11 +17,15 @@ router = APIRouter(
 )
 
 
-@router.get("/courses/{course_id}/grades", response_model=GradesResponse)
+@router.get(
+    "/courses/{course_id}/grades",
+    response_model=GradesResponse,
+    dependencies=[Depends(query_budget(8))]
+)
 async def get_course_grades(
     course_id: UUID,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    current_user: UserSnapshot = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Получить журнал успеваемости по курсу"""
     course_repo = CourseRepository(session)
@@ -45,10 +50,12 @@ async def get_course_grades(
     
     # Обрабатываем задания
     assignments = await assignment_repo.get_by_course(course_id)
+    latest_submissions = await submission_repo.get_latest_by_assignments(
+        [assignment.id for assignment in assignments], current_user.id
+    )
     for assignment in assignments:
         max_total_score += assignment.max_score
-        submissions = await submission_repo.get_by_assignment_and_student(assignment.id, current_user.id)
-        latest_submission = submissions[0] if submissions else None
+        latest_submission = latest_submissions.get(assignment.id)
         score = latest_submission.score if latest_submission and latest_submission.score else None
         if score:
             total_score += score
@@ -65,8 +72,9 @@ async def get_course_grades(
     
     # Обрабатываем тесты
     tests = await test_repo.get_by_course(course_id)
+    best_attempts = await attempt_repo.get_best_attempts([test.id for test in tests], current_user.id)
     for test in tests:
-        best_attempt = await attempt_repo.get_best_attempt(test.id, current_user.id)
+        best_attempt = best_attempts.get(test.id)
         
         # Для тестов max_score берем из попытки, если есть, иначе None
         test_max_score = best_attempt.max_score if best_attempt else None
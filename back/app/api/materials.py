@@ -2,9 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.db.session import get_session
-from app.db.models import User
+from app.db.session import get_session, get_read_session
 from app.utils.deps import get_current_user
+from app.services.user_cache import UserSnapshot
 from app.repo.material import MaterialRepository, MaterialProgressRepository
 from app.repo.course import StudentCourseRepository
 from app.schemas.material import (
@@ -24,8 +24,8 @@ router = APIRouter(
 @router.get("/courses/{course_id}/materials", response_model=CourseMaterialsResponse)
 async def get_course_materials(
     course_id: UUID,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    current_user: UserSnapshot = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Получить структуру материалов курса"""
     material_repo = MaterialRepository(session)
@@ -57,8 +57,8 @@ async def get_course_materials(
 @router.get("/materials/{material_id}", response_model=MaterialDetailResponse)
 async def get_material_detail(
     material_id: UUID,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    current_user: UserSnapshot = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Получить детальную информацию о материале"""
     material_repo = MaterialRepository(session)
@@ -111,22 +111,23 @@ async def get_material_detail(
 async def update_material_progress(
     material_id: UUID,
     request: MaterialProgressRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """Обновить прогресс изучения материала"""
     material_repo = MaterialRepository(session)
     progress_repo = MaterialProgressRepository(session)
     
-    material = await material_repo.get_by_id(material_id)
-    if not material:
+    # Модуль материала не загружен - курс берем отдельным легким запросом
+    course_id = await material_repo.get_course_id(material_id)
+    if not course_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Material not found")
     
     # Проверяем доступ
     student_course_repo = StudentCourseRepository(session)
     student_course = await student_course_repo.get_by_student_and_course(
         current_user.id, 
-        material.module.course_id
+        course_id
     )
     if not student_course:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not enrolled in this course")
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends
+
+from app.core.security import SecurityManager
+from app.db.partitions import partition_manager
+from app.db.session import pool_stats, replica_router
+from app.services.user_cache import user_cache
+from app.utils.deps import require_metrics_access
+
+# Внутреннее состояние (ошибки реплики, пулы, партиции) - только администратору или сборщику метрик
+router = APIRouter(
+    prefix="/internal/metrics",
+    tags=["internal"],
+    dependencies=[Depends(require_metrics_access)],
+)
+
+
+@router.get("/token-cache", summary="Счетчики кэша проверенных JWT")
+async def token_cache_metrics():
+    return SecurityManager.token_cache_stats()
+
+
+@router.get("/user-cache", summary="Счетчики локального кэша снимков пользователя")
+async def user_cache_metrics():
+    return user_cache.stats()
+
+
+@router.get("/replica", summary="Состояние реплики для чтения")
+async def replica_metrics():
+    return replica_router.stats()
+
+
+@router.get("/db-pool", summary="Состояние пулов соединений с БД")
+async def db_pool_metrics():
+    return pool_stats()
+
+
+@router.get("/partitions", summary="Последний прогон обслуживания партиций")
+async def partitions_metrics():
+    return partition_manager.stats()
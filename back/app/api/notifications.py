@@ -3,9 +3,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from typing import Optional
 
-from app.db.session import get_session
-from app.db.models import User
+from app.db.session import get_session, get_read_session
 from app.utils.deps import get_current_user
+from app.services.user_cache import UserSnapshot
 from app.repo.notification import NotificationRepository
 from app.schemas.notification import NotificationsListResponse, NotificationResponse
 
@@ -17,24 +17,46 @@ router = APIRouter(
 
 @router.get("/notifications", response_model=NotificationsListResponse)
 async def get_notifications(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    course_id: Optional[UUID] = Query(None, description="Только уведомления по курсу"),
+    assignment_id: Optional[UUID] = Query(None, description="Только уведомления по заданию"),
+    current_user: UserSnapshot = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Получить список уведомлений"""
     repo = NotificationRepository(session)
-    notifications = await repo.get_by_user(current_user.id, skip, limit)
+    page = await repo.get_by_user(
+        current_user.id,
+        cursor,
+        limit,
+        course_id=course_id,
+        metadata={"assignment_id": str(assignment_id)} if assignment_id else None
+    )
     
     return NotificationsListResponse(
-        notifications=[NotificationResponse.model_validate(n) for n in notifications]
+        notifications=[NotificationResponse.model_validate(n) for n in page.items],
+        next_cursor=page.next_cursor
     )
 
 
+@router.post("/notifications/read-all")
+async def mark_all_notifications_read(
+    course_id: Optional[UUID] = Query(None, description="Только уведомления по курсу"),
+    current_user: UserSnapshot = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """Пометить прочитанными все уведомления (или только по курсу)"""
+    repo = NotificationRepository(session)
+    updated = await repo.mark_all_as_read(current_user.id, course_id)
+    
+    return {"message": "Notifications marked as read", "updated": updated}
+
+
 @router.post("/notifications/{notification_id}/read")
 async def mark_notification_read(
     notification_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """Пометить уведомление как прочитанное"""
@@ -2,11 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
-from app.db.models import User
 from app.utils.deps import get_current_user
+from app.services.user_cache import UserSnapshot
 from app.repo.user import UserRepository
 from app.repo.notification import NotificationSettingsRepository
 from app.core.security import SecurityManager
+from app.services.password_service import password_service
+from app.services.auth_service import AuthService
 from app.core.exeptions import InvalidCredentialsException
 from app.schemas.profile import (
     ProfileResponse,
@@ -24,7 +26,7 @@ router = APIRouter(
 
 @router.get("", response_model=ProfileResponse)
 async def get_profile(
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Получить профиль пользователя"""
     return ProfileResponse.model_validate(current_user)
@@ -33,7 +35,7 @@ async def get_profile(
 @router.put("", response_model=ProfileResponse)
 async def update_profile(
     request: ProfileUpdateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """Обновить профиль пользователя"""
@@ -47,7 +49,7 @@ async def update_profile(
 
 @router.get("/notifications-settings", response_model=NotificationSettingsResponse)
 async def get_notifications_settings(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """Получить настройки уведомлений"""
@@ -64,41 +66,45 @@ async def get_notifications_settings(
 @router.put("/notifications-settings", response_model=NotificationSettingsResponse)
 async def update_notifications_settings(
     request: NotificationSettingsUpdateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """Обновить настройки уведомлений"""
     repo = NotificationSettingsRepository(session)
-    settings = await repo.get_by_user_id(current_user.id)
-    if not settings:
-        from app.db.models import NotificationSettings
-        settings = NotificationSettings(user_id=current_user.id)
-        settings = await repo.create(settings)
-    
     update_data = request.model_dump(exclude_unset=True)
-    updated_settings = await repo.update(settings.id, **update_data)
+    # Обычный случай - один UPDATE ... RETURNING по user_id
+    updated_settings = await repo.update_by_user_id(current_user.id, **update_data)
     if not updated_settings:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Settings not found")
+        # Настроек еще нет - создаем сразу с переданными значениями
+        from app.db.models import NotificationSettings
+        updated_settings = await repo.create(NotificationSettings(user_id=current_user.id, **update_data))
     return NotificationSettingsResponse.model_validate(updated_settings)
 
 
 @router.post("/change-password")
 async def change_password(
     request: ChangePasswordRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """Изменить пароль"""
-    if not SecurityManager.verify_password(request.old_password, current_user.password_hash):
+    repo = UserRepository(session)
+    # В снимке пользователя хеша пароля нет, читаем его из БД
+    user = await repo.get_by_id(current_user.id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    if not await password_service.verify(request.old_password, user.password_hash):
         raise InvalidCredentialsException("Old password is incorrect")
     
     is_valid, message = SecurityManager.validate_password_strength(request.new_password)
     if not is_valid:
         raise InvalidCredentialsException(message)
     
-    repo = UserRepository(session)
-    new_password_hash = SecurityManager.get_password_hash(request.new_password)
+    new_password_hash = await password_service.hash(request.new_password)
     await repo.update(current_user.id, password_hash=new_password_hash)
+
+    # Старые токены (в том числе на других устройствах) больше недействительны
+    await AuthService(session).revoke_all_sessions(current_user.id)
     
     return {"message": "Password changed successfully"}
 
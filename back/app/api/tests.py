@@ -3,9 +3,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from datetime import datetime
 
-from app.db.session import get_session
-from app.db.models import User, TestAttempt
+from app.db.session import get_session, get_read_session
+from app.db.query_stats import query_budget
+from app.db.models import TestAttempt
 from app.utils.deps import get_current_user
+from app.services.user_cache import UserSnapshot
 from app.repo.test import TestRepository, TestAttemptRepository
 from app.repo.course import StudentCourseRepository
 from app.schemas.test import (
@@ -24,11 +26,15 @@ router = APIRouter(
 )
 
 
-@router.get("/courses/{course_id}/tests", response_model=TestsListResponse)
+@router.get(
+    "/courses/{course_id}/tests",
+    response_model=TestsListResponse,
+    dependencies=[Depends(query_budget(6))]
+)
 async def get_course_tests(
     course_id: UUID,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    current_user: UserSnapshot = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Получить список тестов по курсу"""
     test_repo = TestRepository(session)
@@ -41,11 +47,14 @@ async def get_course_tests(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not enrolled in this course")
     
     tests = await test_repo.get_by_course(course_id)
+    test_ids = [test.id for test in tests]
+    attempts_counts = await attempt_repo.get_attempt_counts(test_ids, current_user.id)
+    best_attempts = await attempt_repo.get_best_attempts(test_ids, current_user.id)
     
     tests_list = []
     for test in tests:
-        attempts_count = await attempt_repo.get_attempt_count(test.id, current_user.id)
-        best_attempt = await attempt_repo.get_best_attempt(test.id, current_user.id)
+        attempts_count = attempts_counts.get(test.id, 0)
+        best_attempt = best_attempts.get(test.id)
         
         tests_list.append(TestListItem(
             id=test.id,
@@ -64,14 +73,14 @@ async def get_course_tests(
 @router.get("/tests/{test_id}", response_model=TestDetailResponse)
 async def get_test_detail(
     test_id: UUID,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    current_user: UserSnapshot = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Получить структуру теста"""
     test_repo = TestRepository(session)
     student_course_repo = StudentCourseRepository(session)
     
-    test = await test_repo.get_by_id_with_questions(test_id)
+    test = await test_repo.get_by_id(test_id)
     if not test:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test not found")
     
@@ -83,13 +92,13 @@ async def get_test_detail(
     if not student_course:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not enrolled in this course")
     
+    # Правильные ответы из БД не уходят: варианты вынимаются из JSONB запросом
     questions = []
-    for question in test.questions:
-        options = question.options.get("options", [])
+    for question in await test_repo.get_questions_for_student(test_id):
         questions.append(TestQuestionResponse(
             id=question.id,
             question_text=question.question_text,
-            options=options,
+            options=question.options or [],
             order=question.order,
             points=question.points
         ))
@@ -109,7 +118,7 @@ async def get_test_detail(
 async def submit_test_attempt(
     test_id: UUID,
     request: TestAttemptRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """Отправить ответы на тест"""
@@ -117,7 +126,7 @@ async def submit_test_attempt(
     attempt_repo = TestAttemptRepository(session)
     student_course_repo = StudentCourseRepository(session)
     
-    test = await test_repo.get_by_id_with_questions(test_id)
+    test = await test_repo.get_by_id(test_id)
     if not test:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test not found")
     
@@ -146,10 +155,10 @@ async def submit_test_attempt(
     max_score = 0.0
     question_results = []
     
-    for question in test.questions:
+    for question in await test_repo.get_answer_key(test_id):
         max_score += question.points
         user_answer = request.answers.get(str(question.id))
-        correct_answer = question.options.get("correct", 0)
+        correct_answer = question.correct
         
         is_correct = user_answer == correct_answer
         if is_correct:
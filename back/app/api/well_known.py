@@ -0,0 +1,25 @@
+import hashlib
+import json
+
+from fastapi import APIRouter, Request, Response
+
+from app.core.keys import key_ring
+from app.core.settings import settings
+
+router = APIRouter(
+    prefix="/.well-known",
+    tags=["auth"]
+)
+
+
+@router.get("/jwks.json", summary="Публичные ключи для локальной проверки JWT")
+async def jwks(request: Request):
+    body = json.dumps(key_ring.jwks(), separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    headers = {
+        "Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE}",
+        "ETag": etag,
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1 @@
+# тут служебные команды: python -m app.cli.<команда>
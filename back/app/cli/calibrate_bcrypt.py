@@ -0,0 +1,78 @@
+"""
+Подбирает стоимость bcrypt (BCRYPT_ROUNDS) под железо и бюджет логина.
+
+    python -m app.cli.calibrate_bcrypt [--target-ms 250] [--write .env]
+
+Замеряет время одного хеша для каждого значения rounds и рекомендует
+максимальное, которое укладывается в --target-ms. С --write записывает
+BCRYPT_ROUNDS в env-файл; пароли со старой стоимостью пересчитываются
+при следующем успешном логине пользователя.
+
+Мерить нужно на том же типе машины, где работает backend.
+"""
+import argparse
+import re
+import statistics
+import time
+from pathlib import Path
+
+from passlib.hash import bcrypt
+
+SAMPLE_PASSWORD = "calibration-Password-123"
+
+
+def measure(rounds: int, samples: int) -> float:
+    """Медианное время одного хеша в миллисекундах"""
+    hasher = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.hash(SAMPLE_PASSWORD)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def write_setting(env_file: Path, rounds: int) -> None:
+    line = f"BCRYPT_ROUNDS={rounds}"
+    content = env_file.read_text(encoding="utf-8") if env_file.exists() else ""
+    if re.search(r"^\s*BCRYPT_ROUNDS=.*$", content, flags=re.MULTILINE):
+        content = re.sub(r"^\s*BCRYPT_ROUNDS=.*$", line, content, flags=re.MULTILINE)
+    else:
+        if content and not content.endswith("\n"):
+            content += "\n"
+        content += line + "\n"
+    env_file.write_text(content, encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibrate bcrypt cost for this host")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="бюджет на один хеш при логине")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None, help="PASSWORD_HASH_WORKERS для оценки пропускной способности")
+    parser.add_argument("--write", metavar="ENV_FILE", default=None, help="записать BCRYPT_ROUNDS в env-файл")
+    args = parser.parse_args()
+
+    recommended = args.min_rounds
+    print(f"{'rounds':>6} {'ms/hash':>10} {'logins/s/core':>14}")
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        elapsed_ms = measure(rounds, args.samples)
+        print(f"{rounds:>6} {elapsed_ms:>10.1f} {1000 / elapsed_ms:>14.1f}")
+        if elapsed_ms > args.target_ms:
+            # Каждый следующий шаг вдвое дороже - дальше мерить незачем
+            break
+        recommended = rounds
+
+    elapsed_ms = measure(recommended, args.samples)
+    print(f"\nRecommended BCRYPT_ROUNDS={recommended} ({elapsed_ms:.1f} ms/hash, target {args.target_ms:.0f} ms)")
+    if args.workers:
+        print(f"Login throughput with {args.workers} hash workers: ~{args.workers * 1000 / elapsed_ms:.0f}/s")
+
+    if args.write:
+        write_setting(Path(args.write), recommended)
+        print(f"Written to {args.write}")
+
+
+if __name__ == "__main__":
+    main()
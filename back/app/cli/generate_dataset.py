@@ -0,0 +1,462 @@
+"""
+Генератор синтетических данных для нагрузочных тестов и проверки планов запросов.
+
+    python -m app.cli.generate_dataset --students 200000 --courses 4000 --messages 5000000 --seed 42
+
+Объемы задаются параметрами: университеты, студенты, преподаватели, курсы,
+модули и материалы на курс, задания и тесты, записи на курсы, прогресс,
+отправки, попытки, сообщения, уведомления. С одинаковыми --seed и --end
+получается тот же набор строк с теми же id (UUIDv7 от времени строки).
+
+Строки генерируются потоково и грузятся через COPY (app.db.bulk) пачками
+по --batch-size, каждая пачка - своя транзакция. Партиции messages и
+notifications создаются за весь период, в конце выполняется ANALYZE, чтобы
+планировщик видел реальные кардинальности.
+
+У всех пользователей один пароль (--password): bcrypt считается один раз.
+Запускать на отдельной базе с примененными миграциями; повторный запуск
+с тем же --prefix остановится до загрузки (email уже заняты).
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterable, Iterator, Sequence
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.core.security import SecurityManager
+from app.db.bulk import copy_records
+from app.db.ids import uuid7_from
+from app.db.models import AssignmentStatus, CourseStatus, MaterialType, NotificationType, UserRole
+from app.db.partitions import partition_manager
+from app.db.session import AsyncSessionLocal, engine
+from app.services.password_service import hash_password
+
+FIRST_NAMES = ["Иван", "Мария", "Алексей", "Анна", "Дмитрий", "Елена", "Сергей", "Ольга", "Никита", "Дарья"]
+LAST_NAMES = ["Иванов", "Смирнова", "Кузнецов", "Попова", "Васильев", "Петрова", "Соколов", "Морозова"]
+TOPICS = ["Алгоритмы", "Базы данных", "Сети", "Машинное обучение", "Статистика", "Экономика", "Физика", "Английский"]
+WORDS = ["задание", "вопрос", "дедлайн", "лекция", "пример", "решение", "тест", "материал", "ошибка", "спасибо"]
+NOTIFICATION_TITLES = {
+    NotificationType.ASSIGNMENT_GRADED: "Задание проверено",
+    NotificationType.TEST_GRADED: "Тест проверен",
+    NotificationType.DEADLINE_REMINDER: "Скоро дедлайн",
+    NotificationType.COMMENT_ADDED: "Новый комментарий",
+    NotificationType.COURSE_ANNOUNCEMENT: "Объявление по курсу",
+}
+
+ANALYZE_TABLES = [
+    "users", "user_profiles", "notification_settings", "courses", "modules", "materials",
+    "assignments", "tests", "test_questions", "chat_channels", "student_courses",
+    "material_progress", "submissions", "test_attempts", "messages", "notifications",
+]
+
+
+class DatasetGenerator:
+    def __init__(self, args: argparse.Namespace, password_hash: str):
+        self.args = args
+        self.password_hash = password_hash
+        self.rng = random.Random(args.seed)
+        self.end = datetime(args.end.year, args.end.month, args.end.day, tzinfo=timezone.utc)
+        self.start = self.end - timedelta(days=30 * args.months)
+        self.loaded: dict[str, int] = {}
+
+        self.teachers: list[list[UUID]] = [[] for _ in range(args.universities)]
+        self.users: list[tuple[UUID, datetime]] = []
+        self.students: list[UUID] = []
+        # Курсы по индексу: университет, дата создания и дочерние сущности
+        self.course_ids: list[UUID] = []
+        self.course_teacher: list[UUID] = []
+        self.course_created: list[datetime] = []
+        self.courses_by_university: list[list[int]] = [[] for _ in range(args.universities)]
+        self.course_materials: list[list[UUID]] = []
+        self.course_assignments: list[list[tuple[UUID, datetime]]] = []
+        self.course_tests: list[list[tuple[UUID, int, list[tuple[UUID, int]]]]] = []
+        self.course_channels: list[list[UUID]] = []
+        self.enrollments: list[tuple[UUID, int, datetime]] = []
+
+    # --- помощники ---
+
+    def _moment(self, after: datetime | None = None) -> datetime:
+        start = max(after, self.start) if after else self.start
+        return start + (self.end - start) * self.rng.random()
+
+    def _id(self, moment: datetime) -> UUID:
+        return uuid7_from(int(moment.timestamp() * 1000), self.rng.getrandbits(74))
+
+    def _words(self, count: int) -> str:
+        return " ".join(self.rng.choices(WORDS, k=count))
+
+    async def _copy(self, table: str, columns: Sequence[str], batch: list[Sequence[Any]]) -> int:
+        async with AsyncSessionLocal() as session:
+            count = await copy_records(session, table, columns, batch)
+            await session.commit()
+        return count
+
+    async def load(self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> None:
+        started = time.perf_counter()
+        total = 0
+        batch: list[Sequence[Any]] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.args.batch_size:
+                total += await self._copy(table, columns, batch)
+                batch = []
+        if batch:
+            total += await self._copy(table, columns, batch)
+        elapsed = time.perf_counter() - started
+        self.loaded[table] = self.loaded.get(table, 0) + total
+        print(f"  {table:<22} {total:>11} rows {elapsed:>8.1f}s {total / elapsed if elapsed else 0:>10.0f} rows/s")
+
+    # --- пользователи ---
+
+    def _user_row(self, number: int, university: int, role: UserRole) -> tuple:
+        created = self._moment()
+        user_id = self._id(created)
+        self.users.append((user_id, created))
+        kind = "t" if role == UserRole.TEACHER else "s"
+        return (
+            user_id,
+            f"{self.args.prefix}.{kind}{number}@u{university + 1}.example.edu",
+            self.password_hash,
+            self.rng.choice(FIRST_NAMES),
+            self.rng.choice(LAST_NAMES),
+            role.name,
+            f"Группа {self.rng.randint(1, 40)}" if role == UserRole.STUDENT else None,
+            f"Университет {university + 1}",
+            None,
+            "Europe/Moscow",
+            created,
+            created,
+        )
+
+    def user_rows(self) -> Iterator[tuple]:
+        universities = self.args.universities
+        for number in range(self.args.teachers):
+            row = self._user_row(number, number % universities, UserRole.TEACHER)
+            self.teachers[number % universities].append(row[0])
+            yield row
+        for number in range(self.args.students):
+            row = self._user_row(number, number % universities, UserRole.STUDENT)
+            self.students.append(row[0])
+            yield row
+
+    def profile_rows(self) -> Iterator[tuple]:
+        for user_id, created in self.users:
+            yield self._id(created), user_id, created, created
+
+    def notification_settings_rows(self) -> Iterator[tuple]:
+        for user_id, created in self.users:
+            yield self._id(created), user_id, True, True, True, True, True, 1, created, created
+
+    # --- курсы и их содержимое ---
+
+    def course_rows(self) -> Iterator[tuple]:
+        for index in range(self.args.courses):
+            university = index % self.args.universities
+            created = self.start + (self.end - self.start) * self.rng.random() * 0.2
+            course_id = self._id(created)
+            teacher_id = self.rng.choice(self.teachers[university])
+            self.course_ids.append(course_id)
+            self.course_teacher.append(teacher_id)
+            self.course_created.append(created)
+            self.courses_by_university[university].append(index)
+            status = CourseStatus.COMPLETED if self.rng.random() < 0.1 else CourseStatus.ACTIVE
+            yield (
+                course_id, f"{self.rng.choice(TOPICS)} {index + 1}", self._words(20),
+                teacher_id, status.name, created, created,
+            )
+
+    def module_and_material_rows(self) -> tuple[list[tuple], Iterator[tuple]]:
+        modules: list[tuple] = []
+        materials: list[tuple] = []
+        material_types = list(MaterialType)
+        for index, course_id in enumerate(self.course_ids):
+            created = self.course_created[index]
+            course_materials = []
+            for module_order in range(self.args.modules_per_course):
+                module_id = self._id(created)
+                modules.append((module_id, course_id, f"Модуль {module_order + 1}", self._words(8), module_order, created))
+                for material_order in range(self.args.materials_per_module):
+                    material_id = self._id(created)
+                    material_type = self.rng.choice(material_types)
+                    is_text = material_type == MaterialType.TEXT
+                    materials.append((
+                        material_id, module_id, f"Материал {module_order + 1}.{material_order + 1}",
+                        self._words(10), material_type.name,
+                        None if is_text else f"https://cdn.example.edu/{material_id}",
+                        self._words(60) if is_text else None,
+                        material_order, created,
+                    ))
+                    course_materials.append(material_id)
+            self.course_materials.append(course_materials)
+        return modules, iter(materials)
+
+    def assignment_rows(self) -> Iterator[tuple]:
+        for index, course_id in enumerate(self.course_ids):
+            created = self.course_created[index]
+            assignments = []
+            for number in range(self.args.assignments_per_course):
+                assignment_id = self._id(created)
+                deadline = self._moment(created)
+                materials = self.course_materials[index]
+                material_id = self.rng.choice(materials) if materials and self.rng.random() < 0.5 else None
+                assignments.append((assignment_id, deadline))
+                yield (
+                    assignment_id, course_id, material_id, f"Задание {number + 1}",
+                    self._words(30), 100.0, deadline, created, created,
+                )
+            self.course_assignments.append(assignments)
+
+    def test_and_question_rows(self) -> tuple[list[tuple], list[tuple]]:
+        tests: list[tuple] = []
+        questions: list[tuple] = []
+        for index, course_id in enumerate(self.course_ids):
+            created = self.course_created[index]
+            course_tests = []
+            for number in range(self.args.tests_per_course):
+                test_id = self._id(created)
+                max_attempts = self.rng.randint(1, 3)
+                tests.append((
+                    test_id, course_id, f"Тест {number + 1}", self._words(15),
+                    max_attempts, self.rng.choice([None, 20, 45, 90]), self._moment(created), created,
+                ))
+                answer_key = []
+                for order in range(self.args.questions_per_test):
+                    question_id = self._id(created)
+                    correct = self.rng.randrange(4)
+                    options = {"options": [self._words(3) for _ in range(4)], "correct": correct}
+                    questions.append((
+                        question_id, test_id, self._words(12) + "?", json.dumps(options, ensure_ascii=False), order, 1.0,
+                    ))
+                    answer_key.append((question_id, correct))
+                course_tests.append((test_id, max_attempts, answer_key))
+            self.course_tests.append(course_tests)
+        return tests, questions
+
+    def channel_rows(self) -> Iterator[tuple]:
+        names = ["Общий", "Вопросы по заданиям", "Объявления", "Флуд"]
+        for index, course_id in enumerate(self.course_ids):
+            created = self.course_created[index]
+            channels = []
+            for number in range(self.args.channels_per_course):
+                channel_id = self._id(created)
+                channels.append(channel_id)
+                yield channel_id, course_id, names[number % len(names)], None, created
+            self.course_channels.append(channels)
+
+    # --- активность студентов ---
+
+    def enrollment_rows(self) -> Iterator[tuple]:
+        for number, student_id in enumerate(self.students):
+            courses = self.courses_by_university[number % self.args.universities]
+            for index in self.rng.sample(courses, min(self.args.enrollments_per_student, len(courses))):
+                enrolled = self._moment(self.course_created[index])
+                self.enrollments.append((student_id, index, enrolled))
+                yield (
+                    self._id(enrolled), student_id, self.course_ids[index],
+                    round(self.rng.random() * 100, 1), CourseStatus.ACTIVE.name, enrolled, None,
+                )
+
+    def material_progress_rows(self) -> Iterator[tuple]:
+        for student_id, index, enrolled in self.enrollments:
+            materials = self.course_materials[index]
+            for material_id in self.rng.sample(materials, min(self.args.progress_per_enrollment, len(materials))):
+                updated = self._moment(enrolled)
+                percent = self.rng.choice([100.0, 100.0, round(self.rng.random() * 100, 1)])
+                yield self._id(updated), student_id, material_id, percent, percent >= 100.0, updated
+
+    def submission_rows(self) -> Iterator[tuple]:
+        for student_id, index, enrolled in self.enrollments:
+            assignments = self.course_assignments[index]
+            for assignment_id, deadline in self.rng.sample(assignments, min(self.args.submissions_per_enrollment, len(assignments))):
+                submitted = self._moment(enrolled)
+                graded = self.rng.random() < 0.6
+                yield (
+                    self._id(submitted), assignment_id, student_id, self._words(10),
+                    round(self.rng.uniform(40, 100), 1) if graded else None,
+                    self._words(8) if graded else None,
+                    (AssignmentStatus.GRADED if graded else AssignmentStatus.SUBMITTED).name,
+                    submitted,
+                    submitted + timedelta(days=self.rng.randint(1, 7)) if graded else None,
+                )
+
+    def test_attempt_rows(self) -> Iterator[tuple]:
+        for student_id, index, enrolled in self.enrollments:
+            tests = self.course_tests[index]
+            for test_id, max_attempts, answer_key in self.rng.sample(tests, min(self.args.attempts_per_enrollment, len(tests))):
+                for _ in range(self.rng.randint(1, max_attempts)):
+                    started = self._moment(enrolled)
+                    answers = {}
+                    score = 0.0
+                    for question_id, correct in answer_key:
+                        answer = correct if self.rng.random() < 0.7 else self.rng.randrange(4)
+                        answers[str(question_id)] = answer
+                        score += answer == correct
+                    max_score = float(len(answer_key))
+                    yield (
+                        self._id(started), test_id, student_id, json.dumps(answers), score, max_score,
+                        bool(max_score) and score / max_score >= 0.6,
+                        started, started + timedelta(minutes=self.rng.randint(5, 60)),
+                    )
+
+    def message_rows(self) -> Iterator[tuple]:
+        if not self.enrollments:
+            return
+        for _ in range(self.args.messages):
+            student_id, index, enrolled = self.rng.choice(self.enrollments)
+            # Каждое десятое сообщение - от преподавателя курса
+            sender_id = self.course_teacher[index] if self.rng.random() < 0.1 else student_id
+            created = self._moment(enrolled)
+            yield (
+                self._id(created), self.rng.choice(self.course_channels[index]), sender_id,
+                self._words(self.rng.randint(3, 40)), created,
+            )
+
+    def notification_rows(self) -> Iterator[tuple]:
+        types = list(NotificationType)
+        enrollments_by_student: dict[UUID, list[tuple[int, datetime]]] = {}
+        for student_id, index, enrolled in self.enrollments:
+            enrollments_by_student.setdefault(student_id, []).append((index, enrolled))
+        for student_id, courses in enrollments_by_student.items():
+            for _ in range(self.rng.randint(0, 2 * self.args.notifications_per_student)):
+                index, enrolled = self.rng.choice(courses)
+                created = self._moment(enrolled)
+                notification_type = self.rng.choice(types)
+                metadata = {"course_id": str(self.course_ids[index])}
+                if notification_type in (NotificationType.ASSIGNMENT_GRADED, NotificationType.DEADLINE_REMINDER) \
+                        and self.course_assignments[index]:
+                    metadata["assignment_id"] = str(self.rng.choice(self.course_assignments[index])[0])
+                # Старые уведомления в основном прочитаны
+                is_read = self.rng.random() < (0.9 if created < self.end - timedelta(days=14) else 0.3)
+                yield (
+                    self._id(created), student_id, notification_type.name, NOTIFICATION_TITLES[notification_type],
+                    self._words(15), is_read, json.dumps(metadata), created,
+                )
+
+    # --- загрузка ---
+
+    async def run(self) -> None:
+        await self.load("users", (
+            "id", "email", "password_hash", "first_name", "last_name", "role", "group",
+            "university", "phone", "timezone", "created_at", "updated_at",
+        ), self.user_rows())
+        await self.load("user_profiles", ("id", "user_id", "created_at", "updated_at"), self.profile_rows())
+        await self.load("notification_settings", (
+            "id", "user_id", "email_assignment_graded", "email_test_graded", "email_deadline_reminder",
+            "email_comment_added", "email_course_announcement", "reminder_days_before", "created_at", "updated_at",
+        ), self.notification_settings_rows())
+        self.users = []
+
+        await self.load("courses", (
+            "id", "title", "description", "teacher_id", "status", "created_at", "updated_at",
+        ), self.course_rows())
+        modules, materials = self.module_and_material_rows()
+        await self.load("modules", ("id", "course_id", "title", "description", "order", "created_at"), modules)
+        await self.load("materials", (
+            "id", "module_id", "title", "description", "type", "content_url", "content_text", "order", "created_at",
+        ), materials)
+        await self.load("assignments", (
+            "id", "course_id", "material_id", "title", "description", "max_score", "deadline", "created_at", "updated_at",
+        ), self.assignment_rows())
+        tests, questions = self.test_and_question_rows()
+        await self.load("tests", (
+            "id", "course_id", "title", "description", "max_attempts", "time_limit_minutes", "deadline", "created_at",
+        ), tests)
+        await self.load("test_questions", ("id", "test_id", "question_text", "options", "order", "points"), questions)
+        await self.load("chat_channels", ("id", "course_id", "name", "description", "created_at"), self.channel_rows())
+
+        await self.load("student_courses", (
+            "id", "student_id", "course_id", "progress", "status", "enrolled_at", "completed_at",
+        ), self.enrollment_rows())
+        await self.load("material_progress", (
+            "id", "student_id", "material_id", "progress_percent", "is_completed", "updated_at",
+        ), self.material_progress_rows())
+        await self.load("submissions", (
+            "id", "assignment_id", "student_id", "comment", "score", "teacher_comment", "status",
+            "submitted_at", "graded_at",
+        ), self.submission_rows())
+        await self.load("test_attempts", (
+            "id", "test_id", "student_id", "answers", "score", "max_score", "is_passed", "started_at", "completed_at",
+        ), self.test_attempt_rows())
+
+        # Партиции за весь период истории (фоновая задача создает только будущие)
+        async with engine.begin() as conn:
+            for table in ("messages", "notifications"):
+                await partition_manager.ensure_range(conn, table, self.start.date(), self.end.date())
+        await self.load("messages", ("id", "channel_id", "sender_id", "content", "created_at"), self.message_rows())
+        await self.load("notifications", (
+            "id", "user_id", "type", "title", "message", "is_read", "metadata", "created_at",
+        ), self.notification_rows())
+
+        print("  ANALYZE ...")
+        async with engine.begin() as conn:
+            for table in ANALYZE_TABLES:
+                await conn.execute(text(f"ANALYZE {table}"))
+
+
+async def run(args: argparse.Namespace) -> None:
+    args.teachers = args.teachers or max(args.universities, args.students // 50)
+    try:
+        async with engine.connect() as conn:
+            taken = await conn.scalar(
+                text("SELECT 1 FROM users WHERE email LIKE :pattern LIMIT 1"),
+                {"pattern": f"{args.prefix}.%@%.example.edu"},
+            )
+        if taken:
+            print(f"Users with prefix {args.prefix!r} already exist - use another --prefix or a clean database")
+            return
+
+        password_hash = await asyncio.get_running_loop().run_in_executor(None, hash_password, args.password)
+        generator = DatasetGenerator(args, password_hash)
+        print(f"Generating dataset (seed {args.seed}, {generator.start:%Y-%m-%d} .. {generator.end:%Y-%m-%d})")
+        started = time.perf_counter()
+        await generator.run()
+    finally:
+        await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    total = sum(generator.loaded.values())
+    print(f"Done in {elapsed:.1f}s: {total} rows, {total / elapsed if elapsed else 0:.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset and bulk-load it via COPY")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end", type=date.fromisoformat, default=datetime.now(timezone.utc).date(),
+                        help="last day of generated history (YYYY-MM-DD); fix it for reproducible data")
+    parser.add_argument("--months", type=int, default=12, help="length of generated history")
+    parser.add_argument("--prefix", default="load", help="email prefix of generated users")
+    parser.add_argument("--password", default="LoadTest123!", help="password of every generated user")
+    parser.add_argument("--batch-size", type=int, default=50000, help="rows per COPY / transaction")
+
+    parser.add_argument("--universities", type=int, default=20)
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--teachers", type=int, default=0, help="default: students / 50")
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument("--modules-per-course", type=int, default=8)
+    parser.add_argument("--materials-per-module", type=int, default=6)
+    parser.add_argument("--assignments-per-course", type=int, default=10)
+    parser.add_argument("--tests-per-course", type=int, default=4)
+    parser.add_argument("--questions-per-test", type=int, default=10)
+    parser.add_argument("--channels-per-course", type=int, default=2)
+    parser.add_argument("--enrollments-per-student", type=int, default=5)
+    parser.add_argument("--progress-per-enrollment", type=int, default=8, help="materials with progress per enrollment")
+    parser.add_argument("--submissions-per-enrollment", type=int, default=4)
+    parser.add_argument("--attempts-per-enrollment", type=int, default=2, help="tests attempted per enrollment")
+    parser.add_argument("--messages", type=int, default=2000000)
+    parser.add_argument("--notifications-per-student", type=int, default=20, help="average per student")
+    args = parser.parse_args()
+    if args.courses < args.universities:
+        parser.error("--courses must be at least --universities")
+    is_valid, message = SecurityManager.validate_password_strength(args.password)
+    if not is_valid:
+        parser.error(f"--password: {message}")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
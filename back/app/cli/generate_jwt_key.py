@@ -0,0 +1,43 @@
+"""
+Генерирует новый RSA-ключ для подписи JWT.
+
+    python -m app.cli.generate_jwt_key --dir /secrets/jwt [--kid 2026-10]
+
+Файл сохраняется как {kid}.pem. После перезапуска ключ только публикуется
+в JWKS; подписывать им токены начинают, когда указан JWT_ACTIVE_KID={kid}
+(не раньше JWKS_CACHE_MAX_AGE после публикации, см. app/core/keys.py).
+"""
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate RSA key for JWT signing")
+    parser.add_argument("--dir", required=True, help="каталог JWT_SIGNING_KEYS_DIR")
+    parser.add_argument("--kid", default=None, help="идентификатор ключа (по умолчанию - дата и время)")
+    parser.add_argument("--bits", type=int, default=3072)
+    args = parser.parse_args()
+
+    kid = args.kid or datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    keys_dir = Path(args.dir)
+    keys_dir.mkdir(parents=True, exist_ok=True)
+    key_path = keys_dir / f"{kid}.pem"
+    if key_path.exists():
+        raise SystemExit(f"{key_path} already exists")
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=args.bits)
+    key_path.write_bytes(private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ))
+    key_path.chmod(0o600)
+    print(f"Created {key_path} (kid={kid})")
+
+
+if __name__ == "__main__":
+    main()
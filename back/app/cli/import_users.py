@@ -0,0 +1,227 @@
+"""
+Массовый импорт пользователей из CSV или NDJSON.
+
+    python -m app.cli.import_users users.csv [--batch-size 2000] [--workers 8]
+    cat users.ndjson | python -m app.cli.import_users - --format ndjson
+
+Поля строки: email, password (или готовый password_hash), first_name,
+last_name, role, group, university, phone, timezone. Файл читается потоково,
+пароли хешируются пулом процессов, а пачка пользователей попадает в БД
+через COPY во временную таблицу и один INSERT ... ON CONFLICT (email) DO NOTHING,
+который заодно создает профили и настройки уведомлений.
+Уже существующие email пропускаются, строки с паролем, который не прошел
+бы проверку при регистрации (validate_password_strength), считаются невалидными.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import text
+
+from app.core.security import SecurityManager
+from app.db.bulk import copy_records
+from app.db.models import UserRole
+from app.db.session import AsyncSessionLocal, engine
+from app.services.password_service import hash_password
+
+COLUMNS = ("id", "email", "password_hash", "first_name", "last_name", "role", "group", "university", "phone", "timezone")
+
+CREATE_STAGING_SQL = "CREATE TEMP TABLE import_users (LIKE users INCLUDING DEFAULTS) ON COMMIT DROP"
+
+# Один запрос на пачку: пользователи, профили и настройки уведомлений.
+# Значения настроек задаем явно - default=True в моделях живет только в ORM.
+INSERT_SQL = """
+WITH inserted AS (
+    INSERT INTO users (id, email, password_hash, first_name, last_name, role, "group", university, phone, timezone)
+    SELECT id, email, password_hash, first_name, last_name, role, "group", university, phone, timezone
+    FROM import_users
+    ON CONFLICT (email) DO NOTHING
+    RETURNING id
+), profiles AS (
+    INSERT INTO user_profiles (id, user_id)
+    SELECT gen_random_uuid(), id FROM inserted
+), notification_settings AS (
+    INSERT INTO notification_settings (
+        id, user_id, email_assignment_graded, email_test_graded, email_deadline_reminder,
+        email_comment_added, email_course_announcement, reminder_days_before
+    )
+    SELECT gen_random_uuid(), id, true, true, true, true, true, 1 FROM inserted
+)
+SELECT count(*) FROM inserted
+"""
+
+
+def read_rows(path: str, fmt: str) -> Iterator[dict[str, Any]]:
+    stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if fmt == "csv":
+            yield from csv.DictReader(stream)
+        else:
+            for line in stream:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def detect_format(path: str) -> str:
+    return "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def _clean(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+class UserImporter:
+    def __init__(self, executor: ProcessPoolExecutor, default_password: Optional[str]):
+        self.executor = executor
+        self.default_password = default_password
+        self.seen: set[str] = set()
+        self.total = 0
+        self.inserted = 0
+        self.skipped = 0
+        self.invalid = 0
+
+    def _prepare(self, row: dict[str, Any]) -> Optional[dict[str, Any]]:
+        email = _clean(row.get("email"))
+        if not email or "@" not in email:
+            return None
+        password_hash = _clean(row.get("password_hash"))
+        password = _clean(row.get("password")) or self.default_password
+        if not password_hash and not password:
+            return None
+        # Те же требования к паролю, что и при регистрации
+        if not password_hash and not SecurityManager.validate_password_strength(password)[0]:
+            return None
+        try:
+            role = UserRole(_clean(row.get("role")) or UserRole.STUDENT.value)
+        except ValueError:
+            return None
+        return {
+            "email": email,
+            "password": password,
+            "password_hash": password_hash,
+            "first_name": _clean(row.get("first_name")),
+            "last_name": _clean(row.get("last_name")),
+            # SQLAlchemy хранит в enum-типе имена членов, а не значения
+            "role": role.name,
+            "group": _clean(row.get("group")),
+            "university": _clean(row.get("university")),
+            "phone": _clean(row.get("phone")),
+            "timezone": _clean(row.get("timezone")) or "UTC",
+        }
+
+    async def _hash_missing(self, rows: list[dict[str, Any]]) -> None:
+        loop = asyncio.get_running_loop()
+        pending = [row for row in rows if not row["password_hash"]]
+        hashes = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, hash_password, row["password"]) for row in pending
+        ))
+        for row, password_hash in zip(pending, hashes):
+            row["password_hash"] = password_hash
+
+    async def import_batch(self, raw_rows: list[dict[str, Any]]) -> None:
+        self.total += len(raw_rows)
+        rows = []
+        for raw in raw_rows:
+            row = self._prepare(raw)
+            if row is None:
+                self.invalid += 1
+            elif row["email"] in self.seen:
+                self.skipped += 1
+            else:
+                self.seen.add(row["email"])
+                rows.append(row)
+        if not rows:
+            return
+
+        async with AsyncSessionLocal() as session:
+            # Не тратим bcrypt на тех, кто уже зарегистрирован
+            result = await session.execute(
+                text("SELECT email FROM users WHERE email = ANY(:emails)"),
+                {"emails": [row["email"] for row in rows]},
+            )
+            existing = set(result.scalars())
+            fresh = [row for row in rows if row["email"] not in existing]
+            self.skipped += len(rows) - len(fresh)
+            if not fresh:
+                return
+
+            await self._hash_missing(fresh)
+
+            await session.execute(text(CREATE_STAGING_SQL))
+            await copy_records(
+                session,
+                "import_users",
+                COLUMNS,
+                ([uuid.uuid4()] + [row[column] for column in COLUMNS[1:]] for row in fresh),
+            )
+            inserted = (await session.execute(text(INSERT_SQL))).scalar_one()
+            await session.commit()
+
+        # Остаток - email, зарегистрированные параллельно с импортом
+        self.inserted += inserted
+        self.skipped += len(fresh) - inserted
+
+
+async def run(args: argparse.Namespace) -> None:
+    fmt = args.format or detect_format(args.path)
+    executor = ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    importer = UserImporter(executor, args.default_password)
+    started = time.perf_counter()
+    try:
+        batch: list[dict[str, Any]] = []
+        for row in read_rows(args.path, fmt):
+            batch.append(row)
+            if len(batch) >= args.batch_size:
+                await importer.import_batch(batch)
+                batch = []
+                elapsed = time.perf_counter() - started
+                print(f"  {importer.total} rows, {importer.inserted} inserted, {importer.total / elapsed:.0f} rows/s")
+        if batch:
+            await importer.import_batch(batch)
+    finally:
+        executor.shutdown()
+        await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Done in {elapsed:.1f}s: {importer.total} rows, {importer.inserted} inserted, "
+        f"{importer.skipped} skipped (existing), {importer.invalid} invalid, "
+        f"{importer.total / elapsed if elapsed else 0:.0f} rows/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import users from CSV or NDJSON")
+    parser.add_argument("path", help="путь к файлу или '-' для stdin")
+    parser.add_argument("--format", choices=("csv", "ndjson"), default=None, help="по умолчанию - по расширению файла")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="процессов для bcrypt")
+    parser.add_argument("--default-password", default=None, help="пароль для строк без password/password_hash")
+    args = parser.parse_args()
+    if args.default_password:
+        is_valid, message = SecurityManager.validate_password_strength(args.default_password)
+        if not is_valid:
+            parser.error(f"--default-password: {message}")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Обслуживание помесячных партиций messages и notifications.
+
+    python -m app.cli.partitions [--dry-run]
+
+Создает партиции на PARTITION_PREMAKE_MONTHS месяцев вперед и применяет
+срок хранения каждой таблицы (MESSAGES_RETENTION_*, NOTIFICATIONS_RETENTION_*).
+То же самое приложение делает в фоне; команда нужна для cron на окружениях
+с PARTITION_MAINTENANCE_ENABLED=false и для проверки (--dry-run ничего не меняет).
+За PgBouncer нужен PARTITION_MAINTENANCE_DATABASE_URL (см. app/db/partitions.py).
+"""
+import argparse
+import asyncio
+import json
+
+from app.db.partitions import partition_manager
+from app.db.session import engine
+
+
+async def run(dry_run: bool) -> None:
+    try:
+        report = await partition_manager.run_once(dry_run=dry_run)
+    finally:
+        await partition_manager.engine.dispose()
+        await engine.dispose()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create future partitions and apply retention")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would change")
+    args = parser.parse_args()
+    asyncio.run(run(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Необязательный перевыпуск uuid4-ключей старых строк в UUIDv7 (от времени строки).
+
+    python -m app.cli.rekey_uuid7 --table test_attempts [--batch-size 5000] [--pause 0.5] [--dry-run]
+
+Миграция 0007 старые строки не трогает - новые и так получают UUIDv7.
+Перевыпуск нужен, только если хочется, чтобы и старая часть индекса
+первичного ключа была упорядочена по времени. Каждая пачка - своя короткая
+транзакция, между пачками пауза, чтобы не мешать записи и репликации.
+
+Ключи меняются: id сообщений и уведомлений, которые уже есть у клиентов,
+перестанут находиться (например, POST /api/notifications/{id}/read
+вернет 404), поэтому для этих таблиц запускать в окно обслуживания.
+submissions не поддерживается: на них ссылается submission_files.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app.db.session import engine
+
+# (таблица -> время создания строки, от которого строится UUIDv7)
+TABLES = {
+    "messages": "created_at",
+    "notifications": "created_at",
+    "test_attempts": "coalesce(started_at, now())",
+    "material_progress": "coalesce(updated_at, now())",
+}
+
+# Версия UUID - 13-я шестнадцатеричная цифра (15-й символ текстового вида)
+LEGACY_FILTER = "substr(id::text, 15, 1) <> '7'"
+
+
+async def run(table: str, batch_size: int, pause: float, dry_run: bool) -> None:
+    created = TABLES[table]
+    started = time.perf_counter()
+    total = 0
+    try:
+        if dry_run:
+            async with engine.connect() as conn:
+                remaining = await conn.scalar(text(f"SELECT count(*) FROM {table} WHERE {LEGACY_FILTER}"))
+            print(f"{table}: {remaining} rows with non-UUIDv7 keys")
+            return
+
+        while True:
+            async with engine.begin() as conn:
+                result = await conn.execute(text(
+                    f"WITH batch AS (SELECT id FROM {table} WHERE {LEGACY_FILTER} LIMIT :limit) "
+                    f"UPDATE {table} t SET id = uuid7_at({created}) FROM batch WHERE t.id = batch.id"
+                ), {"limit": batch_size})
+            if not result.rowcount:
+                break
+            total += result.rowcount
+            print(f"  {table}: {total} rows rekeyed")
+            await asyncio.sleep(pause)
+    finally:
+        await engine.dispose()
+    print(f"Done in {time.perf_counter() - started:.1f}s: {total} rows in {table}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rekey legacy uuid4 primary keys to UUIDv7 in batches")
+    parser.add_argument("--table", required=True, choices=sorted(TABLES))
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--pause", type=float, default=0.5, help="секунд между пачками")
+    parser.add_argument("--dry-run", action="store_true", help="только посчитать строки")
+    args = parser.parse_args()
+    asyncio.run(run(args.table, args.batch_size, args.pause, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
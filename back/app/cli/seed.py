@@ -0,0 +1,40 @@
+"""
+Загрузка демо-данных (аккаунты из TEST_ACCOUNTS.md, курсы, задания, чаты).
+
+    python -m app.cli.seed [--force]
+
+Запускается один раз после alembic upgrade head (в Docker Compose - перед
+uvicorn), а не при старте каждого воркера. Повторный запуск делает один
+SELECT по seed_markers и завершается; --force загружает набор заново
+(существующие сущности init_data пропускает).
+"""
+import argparse
+import asyncio
+import time
+
+from app.db.init_data import SEED_NAME, SEED_VERSION, seed_demo_data
+from app.db.session import engine
+
+
+async def run(force: bool) -> None:
+    started = time.perf_counter()
+    try:
+        seeded = await seed_demo_data(force=force)
+    finally:
+        await engine.dispose()
+    elapsed = time.perf_counter() - started
+    if seeded:
+        print(f"Seed {SEED_NAME!r} v{SEED_VERSION} loaded in {elapsed:.1f}s")
+    else:
+        print(f"Seed {SEED_NAME!r} v{SEED_VERSION} already applied, nothing to do")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load demo data once (guarded by seed_markers)")
+    parser.add_argument("--force", action="store_true", help="load even if the seed marker exists")
+    args = parser.parse_args()
+    asyncio.run(run(args.force))
+
+
+if __name__ == "__main__":
+    main()
@@ -60,4 +60,30 @@ class InvalidVerifyTokenException(AuthException):
 
 class InvalidPasswordExepiton(AuthException):
     def __init__(self, status_code = status.HTTP_401_UNAUTHORIZED):
-        super().__init__("Email or Password is Incorrect")
\ No newline at end of file
+        super().__init__("Email or Password is Incorrect")
+
+
+class PasswordHashingBusyException(HTTPException):
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy. Try again later",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class SessionStoreUnavailableException(HTTPException):
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Session storage is unavailable. Try again later",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class InvalidCursorException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
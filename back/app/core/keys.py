@@ -0,0 +1,81 @@
+"""
+Набор ключей для асимметричной подписи JWT (RS256).
+
+Приватные ключи лежат в JWT_SIGNING_KEYS_DIR как {kid}.pem. Подписывает
+только активный ключ - JWT_ACTIVE_KID; если он не задан, самый старый по
+имени файла (новый ключ в каталоге не должен сам становиться активным).
+Проверка идет по kid из заголовка токена. Публичные части всех ключей
+публикуются в /.well-known/jwks.json, поэтому другие сервисы проверяют
+токены сами.
+
+Ротация в два шага - сначала опубликовать, потом активировать:
+1. положить новый ключ в каталог (python -m app.cli.generate_jwt_key) и
+   перезапустить воркеры, не меняя JWT_ACTIVE_KID: ключ появляется в JWKS,
+   подпись прежняя;
+2. выждать JWKS_CACHE_MAX_AGE (кэш JWKS у потребителей), затем указать
+   JWT_ACTIVE_KID=<новый kid> и перезапустить воркеры.
+Старый ключ убрать после истечения выданных им токенов.
+"""
+from pathlib import Path
+from typing import Any, Optional
+
+import structlog
+from jose import jwk
+
+from app.core.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+ALGORITHM = "RS256"
+
+
+class KeyRing:
+    def __init__(self, keys_dir: Optional[str], active_kid: Optional[str] = None):
+        self._private: dict[str, str] = {}
+        self._public: dict[str, str] = {}
+        self._jwks: list[dict[str, Any]] = []
+        self.active_kid: Optional[str] = None
+
+        if not keys_dir:
+            return
+        path = Path(keys_dir)
+        if not path.is_dir():
+            logger.warning("JWT signing keys directory not found", path=str(path))
+            return
+
+        for key_file in sorted(path.glob("*.pem")):
+            kid = key_file.stem
+            pem = key_file.read_text()
+            key = jwk.construct(pem, ALGORITHM)
+            public_key = key.public_key()
+            self._private[kid] = pem
+            self._public[kid] = public_key.to_pem().decode("utf-8")
+            self._jwks.append({**public_key.to_dict(), "kid": kid, "use": "sig", "alg": ALGORITHM})
+
+        if not self._private:
+            logger.warning("No JWT signing keys found", path=str(path))
+            return
+
+        if active_kid is None and len(self._private) > 1:
+            logger.warning("JWT_ACTIVE_KID is not set, signing with the oldest key", kids=sorted(self._private))
+        self.active_kid = active_kid or sorted(self._private)[0]
+        if self.active_kid not in self._private:
+            raise ValueError(f"Active JWT key '{self.active_kid}' not found in {path}")
+        logger.info("JWT key ring loaded", kids=sorted(self._private), active_kid=self.active_kid)
+
+    @property
+    def enabled(self) -> bool:
+        return self.active_kid is not None
+
+    def signing_key(self) -> tuple[str, str]:
+        return self.active_kid, self._private[self.active_kid]
+
+    def verification_key(self, kid: str) -> Optional[str]:
+        return self._public.get(kid)
+
+    def jwks(self) -> dict[str, Any]:
+        return {"keys": list(self._jwks)}
+
+
+# Глобальный набор ключей
+key_ring = KeyRing(settings.JWT_SIGNING_KEYS_DIR, settings.JWT_ACTIVE_KID)
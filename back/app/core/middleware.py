@@ -1,70 +1,93 @@
-from typing import Optional, Set, Callable
+from typing import Any, Optional
 
 import structlog
-from fastapi import Request
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.core.security import SecurityManager  
+from app.core.security import SecurityManager
+from app.core.settings import settings
+from app.db.query_stats import collect_queries
 
 logger = structlog.get_logger(__name__)
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, open_paths: Optional[Set[str]] = None):
-        super().__init__(app)
-
-        # Пути, которые можно вызывать без access токена.
-        # По типичным правилам это login, signup, health, метрики, swagger.
-        self.open_paths = open_paths or {
-            "/api/auth/login",
-            "/api/auth/signup",
-            "/api/auth/refresh",
-            "/api/health/ping",
-            "/docs",
-            "/openapi.json",
-            "/redoc"
-        }
-
-    async def dispatch(self, request: Request, call_next):
-        path = request.url.path
-
-        # 1. Разрешенные без токена
-        if path in self.open_paths:
-            return await call_next(request)
-
-        # 2. Достаем Authorization
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Authorization header missing"},
-            )
-
-        parts = auth_header.split()
-        if len(parts) != 2 or parts[0].lower() != "bearer":
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Invalid Authorization header format"},
-            )
-
-        token = parts[1]
-
-        # 3. Проверяем токен через SecurityManager
-        payload = SecurityManager.verify_token(token)
-        if payload is None:
-            # verify_token уже залогировал причину отказа
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Invalid or expired token"},
-            )
-
-        request.state.current_user = {
-            "user_id": payload.get("sub"),
-            "token_payload": payload,
-        }
-
-        logger.bind(user_id=payload.get("sub")).info("Authenticated request")
-
-        response = await call_next(request)
-        return response
+# Ключ в ASGI scope, под которым лежит проверенный пользователь запроса
+PRINCIPAL_SCOPE_KEY = "principal"
+# Ключ в ASGI scope со статистикой SQL-запросов (для лога запроса)
+QUERY_STATS_SCOPE_KEY = "query_stats"
+
+
+def _get_bearer_token(scope: Scope) -> Optional[str]:
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token.strip():
+                return None
+            return token.strip()
+    return None
+
+
+def get_principal(scope: Scope) -> Optional[dict[str, Any]]:
+    return scope.get(PRINCIPAL_SCOPE_KEY)
+
+
+class AuthMiddleware:
+    """
+    Чистый ASGI middleware: один раз проверяет bearer-токен и кладет
+    principal в scope, откуда его читает get_current_user.
+
+    Запросы без токена или с невалидным токеном не отклоняются здесь -
+    решение о доступе по-прежнему принимают зависимости роутов, поэтому
+    открытые пути (login, health, docs) не нужно перечислять отдельно.
+    В отличие от BaseHTTPMiddleware не создает отдельную задачу и не
+    оборачивает тело ответа в поток.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            token = _get_bearer_token(scope)
+            if token:
+                payload = SecurityManager.verify_token(token, allowed_types={"access"})
+                if payload is not None:
+                    scope[PRINCIPAL_SCOPE_KEY] = {
+                        "user_id": payload.get("sub"),
+                        "token_payload": payload,
+                    }
+
+        await self.app(scope, receive, send)
+
+
+class QueryStatsMiddleware:
+    """
+    Считает SQL-запросы и время в БД на HTTP-запрос: заголовок Server-Timing,
+    статистика в scope для лога запроса и предупреждение о N+1.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.QUERY_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        with collect_queries() as stats:
+            scope[QUERY_STATS_SCOPE_KEY] = stats
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                for statement, count in stats.repeated(settings.QUERY_N_PLUS_ONE_THRESHOLD):
+                    logger.warning(
+                        "Possible N+1 queries",
+                        path=scope.get("path"),
+                        count=count,
+                        statement=" ".join(statement.split())[:300],
+                    )
@@ -0,0 +1,46 @@
+from typing import Optional
+
+import structlog
+from redis.asyncio import Redis
+
+from app.core.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+_client: Optional[Redis] = None
+
+
+def get_redis() -> Optional[Redis]:
+    """
+    Общий клиент Redis для кэшей и служебных данных.
+    Возвращает None, если REDIS_URL не задан - вызывающий код должен уметь работать без Redis.
+    """
+    global _client
+    if not settings.REDIS_URL:
+        return None
+    if _client is None:
+        _client = Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            health_check_interval=30,
+        )
+    return _client
+
+
+async def close_redis() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def create_pubsub_client() -> Optional[Redis]:
+    """
+    Отдельный клиент для подписок: соединение pub/sub подолгу простаивает,
+    поэтому общий socket_timeout к нему не применяем.
+    """
+    if not settings.REDIS_URL:
+        return None
+    return Redis.from_url(settings.REDIS_URL, decode_responses=True, health_check_interval=30)
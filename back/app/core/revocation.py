@@ -0,0 +1,219 @@
+"""
+Отзыв токенов без запроса в БД на каждый вызов.
+
+Два механизма:
+- watermark пользователя: все токены, выпущенные раньше отметки, недействительны
+  (смена пароля, выход на всех устройствах). Сравнение в миллисекундах
+  (claim iat_ms), иначе токен, выданный в ту же секунду до отметки, выживал бы;
+  отметки старше срока жизни access токена удаляются - такие токены уже истекли;
+- denylist по jti: отзыв одного конкретного токена (logout).
+
+Источник правды - Redis (hash auth:revoked_before и zset auth:denylist со
+score = exp). Каждый воркер держит локальное зеркало и получает изменения
+через pub/sub, поэтому проверка в verify_token - это пара обращений к dict
+и bloom-фильтру, без сетевых вызовов.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import time
+from typing import Any, Optional
+
+import structlog
+from redis.exceptions import RedisError
+
+from app.core.redis import create_pubsub_client, get_redis
+from app.core.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+WATERMARKS_KEY = "auth:revoked_before"
+DENYLIST_KEY = "auth:denylist"
+CHANNEL = "auth:revocation"
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _watermark_ms(value: Any) -> int:
+    # Отметки, записанные до перехода на миллисекунды, хранились в секундах
+    value = int(value)
+    return value * 1000 if value < 10**11 else value
+
+
+def _issued_ms(payload: dict[str, Any]) -> int:
+    if "iat_ms" in payload:
+        return int(payload["iat_ms"])
+    return int(payload.get("iat", 0)) * 1000
+
+
+class BloomFilter:
+    """Bloom-фильтр на bytearray с двойным хешированием (Kirsch-Mitzenmacher)"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationList:
+    def __init__(self):
+        self._watermarks: dict[str, int] = {}
+        self._denied: dict[str, int] = {}  # jti -> exp, подтверждение для срабатываний bloom
+        self._bloom = self._new_bloom()
+        self._listener: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _new_bloom() -> BloomFilter:
+        return BloomFilter(settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE)
+
+    # --- проверка (синхронная, вызывается из verify_token) ---
+
+    def is_revoked(self, payload: dict[str, Any]) -> bool:
+        watermark = self._watermarks.get(str(payload.get("sub")))
+        if watermark is not None and _issued_ms(payload) < watermark:
+            return True
+        jti = payload.get("jti")
+        if jti and jti in self._bloom:
+            return jti in self._denied
+        return False
+
+    # --- локальное зеркало ---
+
+    def _apply(self, event: dict[str, Any]) -> None:
+        if event.get("kind") == "user":
+            user_id = event["user_id"]
+            self._watermarks[user_id] = max(self._watermarks.get(user_id, 0), _watermark_ms(event["before"]))
+        elif event.get("kind") == "token":
+            self._denied[event["jti"]] = int(event["exp"])
+            self._bloom.add(event["jti"])
+            if len(self._denied) > settings.REVOCATION_BLOOM_CAPACITY:
+                self._prune()
+
+    @staticmethod
+    def _watermark_horizon_ms() -> int:
+        # Отметка нужна, пока живы access токены, выданные до нее (+ минута на расхождение часов);
+        # refresh-семейства при отзыве удаляются из хранилища сессий
+        return _now_ms() - (settings.ACCESS_TOKEN_EXPIRE_MINUTES + 1) * 60 * 1000
+
+    def _prune(self) -> None:
+        # Истекшие токены и так не пройдут проверку exp - убираем их и пересобираем фильтр
+        now = int(time.time())
+        self._denied = {jti: exp for jti, exp in self._denied.items() if exp > now}
+        horizon = self._watermark_horizon_ms()
+        self._watermarks = {user_id: ts for user_id, ts in self._watermarks.items() if ts > horizon}
+        self._bloom = self._new_bloom()
+        for jti in self._denied:
+            self._bloom.add(jti)
+
+    async def load(self) -> None:
+        """Полная загрузка состояния из Redis (при старте и после переподключения)"""
+        redis = get_redis()
+        if redis is None:
+            return
+        now = int(time.time())
+        horizon = self._watermark_horizon_ms()
+        try:
+            await redis.zremrangebyscore(DENYLIST_KEY, "-inf", now)
+            watermarks = await redis.hgetall(WATERMARKS_KEY)
+            # Токены, выданные до устаревших отметок, уже истекли - удаляем и из Redis
+            expired = [user_id for user_id, ts in watermarks.items() if _watermark_ms(ts) <= horizon]
+            if expired:
+                await redis.hdel(WATERMARKS_KEY, *expired)
+            denied = await redis.zrangebyscore(DENYLIST_KEY, now, "+inf", withscores=True)
+        except RedisError as e:
+            logger.warning("Failed to load revocation list", error=str(e))
+            return
+
+        self._watermarks = {
+            user_id: _watermark_ms(ts) for user_id, ts in watermarks.items() if _watermark_ms(ts) > horizon
+        }
+        self._denied = {jti: int(exp) for jti, exp in denied}
+        self._prune()
+        logger.info("Revocation list loaded", users=len(self._watermarks), tokens=len(self._denied))
+
+    async def _publish(self, event: dict[str, Any]) -> None:
+        self._apply(event)
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                if event["kind"] == "user":
+                    pipe.hset(WATERMARKS_KEY, event["user_id"], event["before"])
+                else:
+                    pipe.zadd(DENYLIST_KEY, {event["jti"]: event["exp"]})
+                pipe.publish(CHANNEL, json.dumps(event))
+                await pipe.execute()
+        except RedisError as e:
+            # Локально отзыв уже применен, остальные воркеры узнают после восстановления Redis
+            logger.error("Failed to publish revocation", error=str(e), event=event)
+
+    async def revoke_user(self, user_id: Any) -> None:
+        """Делает недействительными все токены пользователя, выданные до текущего момента"""
+        await self._publish({"kind": "user", "user_id": str(user_id), "before": _now_ms()})
+
+    async def revoke_token(self, jti: str, exp: int) -> None:
+        """Отзывает один токен до момента его истечения"""
+        if exp <= time.time():
+            return
+        await self._publish({"kind": "token", "jti": jti, "exp": int(exp)})
+
+    # --- синхронизация между воркерами ---
+
+    async def _listen(self) -> None:
+        client = create_pubsub_client()
+        if client is None:
+            return
+        try:
+            while True:
+                try:
+                    async with client.pubsub() as pubsub:
+                        await pubsub.subscribe(CHANNEL)
+                        # Подписались - догружаем то, что могли пропустить
+                        await self.load()
+                        async for message in pubsub.listen():
+                            if message.get("type") == "message":
+                                self._apply(json.loads(message["data"]))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("Revocation listener disconnected", error=str(e))
+                    await asyncio.sleep(1)
+        finally:
+            await client.aclose()
+
+    async def start(self) -> None:
+        if get_redis() is None or self._listener is not None:
+            return
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+# Глобальный экземпляр списка отзыва
+revocation_list = RevocationList()
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
@@ -7,20 +10,36 @@ import structlog
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
+from app.core.keys import ALGORITHM as KEY_RING_ALGORITHM, key_ring
+from app.core.revocation import revocation_list
 from app.core.settings import settings
 
 logger = structlog.get_logger(__name__)
 
 # Инициализируем CryptContext с обработкой ошибок при инициализации
+# Стоимость bcrypt задается BCRYPT_ROUNDS (подбирается app.cli.calibrate_bcrypt).
+# min/max = целевое значение, поэтому needs_update() срабатывает на хешах
+# с любой другой стоимостью, и они пересчитываются при следующем логине.
+_bcrypt_policy = {
+    "bcrypt__default_rounds": settings.BCRYPT_ROUNDS,
+    "bcrypt__min_rounds": settings.BCRYPT_ROUNDS,
+    "bcrypt__max_rounds": settings.BCRYPT_ROUNDS,
+}
+
 try:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", **_bcrypt_policy)
     # Принудительно инициализируем backend, чтобы избежать проблем с detect_wrap_bug
     # Используем короткий тестовый пароль для инициализации
     _ = pwd_context.hash("test")
 except Exception as e:
     logger.warning("Error initializing bcrypt context", error=str(e))
     # Если не удалось инициализировать, создаем контекст без автоматической детекции
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", **_bcrypt_policy)
+
+# Уже проверенные payload'ы по sha256 от токена: один токен приходит
+# с каждым запросом страницы, подпись и JSON достаточно разобрать один раз
+_verified_tokens = TTLCache(maxsize=settings.TOKEN_CACHE_MAXSIZE, ttl=0)
 
 
 class SecurityManager:
@@ -28,14 +47,33 @@ class SecurityManager:
     def _now() -> datetime:
         return datetime.now(timezone.utc)
 
+    @staticmethod
+    def _encode(claims: dict[str, Any]) -> str:
+        # RS256 с kid, если настроен набор ключей, иначе общий SECRET_KEY (HS256)
+        if key_ring.enabled:
+            kid, private_key = key_ring.signing_key()
+            return jwt.encode(
+                claims=claims,
+                key=private_key,
+                algorithm=KEY_RING_ALGORITHM,
+                headers={"kid": kid},
+            )
+        return jwt.encode(
+            claims=claims,
+            key=settings.SECRET_KEY,
+            algorithm=(settings.ALGORITHM or "HS256"),
+        )
+
     @staticmethod
     def create_access_token(
         subject: str,
         token_type: Optional[str] = "access",
-        expires_delta: Optional[timedelta] = None
+        expires_delta: Optional[timedelta] = None,
+        extra_claims: Optional[dict[str, Any]] = None,
     ) -> str:
         """
-        Простой access JWT для фронта (HS256, без iss/aud).
+        Простой access JWT для фронта (без iss/aud). Подпись - см. _encode.
+        extra_claims - дополнительные поля payload (например, jti/fam у refresh).
         """
         now = SecurityManager._now()
         expire = now + (expires_delta or timedelta(
@@ -46,16 +84,15 @@ class SecurityManager:
             "sub":  subject,
             "type": token_type,
             "iat": int(now.timestamp()),
+            "iat_ms": int(now.timestamp() * 1000),  # для watermark отзыва: iat в секундах слишком груб
             "nbf": int(now.timestamp()),
             "exp": int(expire.timestamp()),
+            "jti": uuid.uuid4().hex,  # нужен для точечного отзыва токена
         }
+        if extra_claims:
+            to_encode.update(extra_claims)
 
-        token = jwt.encode(
-            claims=to_encode,
-            key=settings.SECRET_KEY,
-            algorithm=(settings.ALGORITHM or "HS256"),
-        )
-        return token
+        return SecurityManager._encode(to_encode)
 
     @staticmethod
     def create_robot_token(
@@ -78,12 +115,7 @@ class SecurityManager:
             "exp": int(expire.timestamp()),
         }
 
-        token = jwt.encode(
-            claims=to_encode,
-            key=settings.SECRET_KEY,
-            algorithm=(settings.ALGORITHM or "HS256"),
-        )
-        return token
+        return SecurityManager._encode(to_encode)
 
 
     @staticmethod
@@ -97,16 +129,61 @@ class SecurityManager:
         Возвращает payload (dict) или None.
         """
 
+        cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+        payload = _verified_tokens.get(cache_key)
+        if payload is None:
+            payload = SecurityManager._decode_token(token)
+            if payload is None:
+                return None
+            # Запись живет ровно до exp токена, неудачные проверки не кэшируем
+            exp = payload.get("exp")
+            if isinstance(exp, (int, float)):
+                _verified_tokens.set(cache_key, payload, ttl=exp - time.time())
+
+        # Отзыв проверяем и для закэшированных токенов: только локальные dict и bloom
+        if revocation_list.is_revoked(payload):
+            logger.warning("Revoked JWT presented", sub=payload.get("sub"), jti=payload.get("jti"))
+            return None
+
+        token_type = payload.get("type")
+        if allowed_types is not None:
+            if token_type not in allowed_types:
+                logger.warning(
+                    "JWT type mismatch",
+                    actual=token_type,
+                    allowed=allowed_types,
+                )
+                return None
+
+        # Копия, чтобы вызывающий код не испортил закэшированный payload
+        return dict(payload)
+
+    @staticmethod
+    def _decode_token(token: str) -> Optional[dict[str, Any]]:
         options = {
             "verify_aud": False,
             "leeway": 30,  # немного терпимости к рассинхрону часов
         }
 
         try:
+            kid = jwt.get_unverified_header(token).get("kid")
+            if kid is not None and key_ring.enabled:
+                key = key_ring.verification_key(kid)
+                if key is None:
+                    logger.warning("JWT signed with unknown key", kid=kid)
+                    return None
+                algorithms = [KEY_RING_ALGORITHM]
+            elif key_ring.enabled and not settings.JWT_ACCEPT_LEGACY_HS256:
+                logger.warning("JWT without kid rejected")
+                return None
+            else:
+                key = settings.SECRET_KEY
+                algorithms = [settings.ALGORITHM or "HS256"]
+
             payload = jwt.decode(
                 token=token,
-                key=settings.SECRET_KEY,
-                algorithms=[settings.ALGORITHM or "HS256"],
+                key=key,
+                algorithms=algorithms,
                 options=options,
             )
 
@@ -114,32 +191,38 @@ class SecurityManager:
             logger.warning("JWT verification failed", error=str(e))
             return None
 
-        token_type = payload.get("type")
-        if allowed_types is not None:
-            if token_type not in allowed_types:
-                logger.warning(
-                    "JWT type mismatch",
-                    actual=token_type,
-                    allowed=allowed_types,
-                )
-                return None
-
         return payload
+
+    @staticmethod
+    def token_cache_stats() -> dict[str, int]:
+        return _verified_tokens.stats()
     
 
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
+    def _truncate_password(password: str) -> str:
         # bcrypt ограничение: максимум 72 байта
         # Безопасно обрезаем пароль до 72 байт перед проверкой
-        password_bytes = plain_password.encode('utf-8')
+        password_bytes = password.encode('utf-8')
         if len(password_bytes) > 72:
             # Обрезаем до 72 байт, но убеждаемся что не обрезаем середину UTF-8 символа
             truncated = password_bytes[:72]
             # Удаляем неполные UTF-8 последовательности в конце
             while truncated and truncated[-1] & 0x80 and not (truncated[-1] & 0x40):
                 truncated = truncated[:-1]
-            plain_password = truncated.decode('utf-8', errors='ignore')
-        return pwd_context.verify(plain_password, hashed_password)
+            password = truncated.decode('utf-8', errors='ignore')
+        return password
+
+    @staticmethod
+    def verify_password(plain_password: str, hashed_password: str) -> bool:
+        return pwd_context.verify(SecurityManager._truncate_password(plain_password), hashed_password)
+
+    @staticmethod
+    def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+        """
+        Проверяет пароль и, если хеш посчитан с другой стоимостью, чем BCRYPT_ROUNDS,
+        возвращает новый хеш для сохранения (иначе None)
+        """
+        return pwd_context.verify_and_update(SecurityManager._truncate_password(plain_password), hashed_password)
 
     @staticmethod
     def get_password_hash(password: str) -> str:
@@ -1,3 +1,6 @@
+from typing import Literal
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -8,22 +11,97 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     DATABASE_URL: str
     ASYNC_DATABASE_URL: str
+    # Пул соединений SQLAlchemy (на каждый воркер uvicorn)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30  # сколько ждать свободное соединение до ошибки
+    DB_POOL_RECYCLE: int = 1800
+    DB_PGBOUNCER: bool = False  # PgBouncer в режиме transaction: без кэша prepared statements
+    # Статистика SQL на запрос: Server-Timing, поля лога, детектор N+1
+    QUERY_STATS_ENABLED: bool = True
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 5  # столько одинаковых запросов за HTTP-запрос - вероятно N+1
+    QUERY_BUDGET_STRICT: bool = False  # в тестах: превышение query_budget - ошибка, а не warning
+    # Журнал медленных запросов с планом EXPLAIN (0 - выключен)
+    SLOW_QUERY_THRESHOLD_MS: int = 200
+    SLOW_QUERY_EXPLAIN: bool = True
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: int = 300  # не чаще одного EXPLAIN на одинаковый SQL
+    SLOW_QUERY_LOG_PATH: str = "logs/slow_queries.log"
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUPS: int = 5
+    # Реплика для чтения GET-эндпоинтов; без нее все запросы идут в primary
+    ASYNC_DATABASE_REPLICA_URL: str | None = None
+    DB_REPLICA_STICKY_SECONDS: int = 15  # после записи чтения пользователя идут в primary; не меньше MAX_LAG + CHECK_INTERVAL
+    DB_REPLICA_STICKY_MAXSIZE: int = 10000  # сколько пользователей с недавней записью помнит процесс
+    DB_REPLICA_MAX_LAG_SECONDS: float = 10  # при большем отставании реплика выключается
+    DB_REPLICA_CHECK_INTERVAL_SECONDS: float = 5
+    # Помесячные партиции messages/notifications: создание вперед и срок хранения (0 - хранить всё)
+    PARTITION_MAINTENANCE_ENABLED: bool = True  # фоновая задача в приложении (иначе cron + app.cli.partitions)
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 6 * 3600
+    PARTITION_MAINTENANCE_DATABASE_URL: str | None = None  # прямой адрес Postgres мимо PgBouncer (обязателен при DB_PGBOUNCER)
+    PARTITION_PREMAKE_MONTHS: int = 3
+    MESSAGES_RETENTION_MONTHS: int = 0
+    MESSAGES_RETENTION_MODE: Literal["detach", "drop"] = "detach"  # detach - отцепить (таблица остается для архива), drop - удалить
+    NOTIFICATIONS_RETENTION_MONTHS: int = 0
+    NOTIFICATIONS_RETENTION_MODE: Literal["detach", "drop"] = "detach"
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     SECRET_KEY: str
     PASSWORD_MIN_LENGTH: int
     ALGORITHM: str = "HS256"
+    # Асимметричная подпись JWT (RS256): каталог с {kid}.pem, без него - HS256 на SECRET_KEY
+    JWT_SIGNING_KEYS_DIR: str | None = None
+    JWT_ACTIVE_KID: str | None = None
+    JWT_ACCEPT_LEGACY_HS256: bool = True  # принимать старые HS256 токены на время перехода
+    JWKS_CACHE_MAX_AGE: int = 300
     ISSUER: str | None = None 
     AUDIENCE: str | None = None
     REDIS_URL: str | None = None
+    REDIS_SOCKET_TIMEOUT: float = 0.5  # Redis - кэш, долго ждать его нельзя
     # Yandex S3 настройки
     S3_ENDPOINT: str | None = None  # https://storage.yandexcloud.net
     S3_ACCESS_KEY_ID: str | None = None
     S3_SECRET_ACCESS_KEY: str | None = None
     S3_BUCKET_NAME: str | None = None
     S3_REGION: str = "ru-central1"
+    # Хеширование паролей (bcrypt) в отдельном пуле процессов
+    PASSWORD_HASH_WORKERS: int = 2  # сколько хешей считаем одновременно
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # сколько запросов может ждать свободный воркер
+    BCRYPT_ROUNDS: int = 12  # стоимость bcrypt, подбирается python -m app.cli.calibrate_bcrypt
+    # Кэш снимков пользователя для get_current_user
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 10  # локальный кэш воркера, ограничивает устаревание между воркерами
+    USER_CACHE_LOCAL_MAXSIZE: int = 10000
+    USER_CACHE_REDIS_TTL_SECONDS: int = 300
+    # Кэш проверенных JWT (в памяти воркера)
+    TOKEN_CACHE_MAXSIZE: int = 10000
+    # Отзыв токенов: локальный bloom-фильтр по jti
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    # Rate limiting ('запросов/секунд', считается отдельно по IP и по аккаунту)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_AUTH: str = "10/60"  # вход/регистрация на один email
+    RATE_LIMIT_AUTH_IP: str = "300/60"  # вход/регистрация с одного IP (NAT кампуса)
+    RATE_LIMIT_REFRESH: str = "10/60"  # обновления на одну refresh-сессию
+    RATE_LIMIT_REFRESH_IP: str = "1200/60"
+    RATE_LIMIT_CHAT_MESSAGE: str = "30/60"
+    RATE_LIMIT_SUBMISSION: str = "10/60"
+    # Доступ к /internal/metrics/*: администратор или заголовок X-Metrics-Token (для сборщика метрик)
+    METRICS_TOKEN: str | None = None
 
 
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
+    @model_validator(mode="after")
+    def _check_replica_sticky_window(self) -> "Settings":
+        # Реплика считается здоровой при отставании до MAX_LAG, а замечают превышение
+        # не позже чем через CHECK_INTERVAL; если вернуть чтения пользователя на нее
+        # раньше, он не увидит собственную запись
+        min_sticky = self.DB_REPLICA_MAX_LAG_SECONDS + self.DB_REPLICA_CHECK_INTERVAL_SECONDS
+        if self.ASYNC_DATABASE_REPLICA_URL and self.DB_REPLICA_STICKY_SECONDS < min_sticky:
+            raise ValueError(
+                f"DB_REPLICA_STICKY_SECONDS ({self.DB_REPLICA_STICKY_SECONDS}) must be at least "
+                f"DB_REPLICA_MAX_LAG_SECONDS + DB_REPLICA_CHECK_INTERVAL_SECONDS ({min_sticky:g})"
+            )
+        return self
+
 settings = Settings()
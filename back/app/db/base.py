@@ -23,4 +23,6 @@ from sqlalchemy.orm import (
 )
 
 class Base(DeclarativeBase):
-    pass
+    # Серверные значения (created_at, updated_at) приходят через RETURNING
+    # в том же INSERT/UPDATE, без отдельного SELECT/refresh после записи
+    __mapper_args__ = {"eager_defaults": True}
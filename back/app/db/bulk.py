@@ -0,0 +1,31 @@
+"""
+Помощники для массовой загрузки данных через COPY (asyncpg).
+"""
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def get_driver_connection(session: AsyncSession):
+    """asyncpg.Connection, на котором работает текущая транзакция сессии"""
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    return raw.driver_connection
+
+
+async def copy_records(
+    session: AsyncSession,
+    table: str,
+    columns: Sequence[str],
+    records: Iterable[Sequence[Any]],
+) -> int:
+    """
+    Загружает строки в таблицу через COPY FROM STDIN в бинарном формате.
+    Выполняется в транзакции сессии - коммит остается за вызывающим кодом.
+    """
+    records = list(records)
+    if not records:
+        return 0
+    driver = await get_driver_connection(session)
+    await driver.copy_records_to_table(table, records=records, columns=list(columns))
+    return len(records)
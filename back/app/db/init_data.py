@@ -1,12 +1,14 @@
 """
 Скрипт для инициализации тестовых данных в БД.
-Запускается при старте приложения, если данных еще нет.
+Запускается отдельно от приложения (python -m app.cli.seed); загрузка
+выполняется один раз - после нее в seed_markers пишется маркер набора.
 """
 import asyncio
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select, text
 
 from app.core.security import SecurityManager
 from app.db.models import (
@@ -15,9 +17,16 @@ from app.db.models import (
     Assignment, Submission, SubmissionFile,
     Test, TestQuestion, TestAttempt,
     ChatChannel, Message,
-    Notification
+    Notification, SeedMarker
 )
-from app.db.session import AsyncSessionLocal
+from app.db.session import AsyncSessionLocal, engine
+
+# Набор демо-данных; при изменении данных ниже версию увеличивают
+SEED_NAME = "demo"
+SEED_VERSION = 1
+
+# Произвольная константа: ключ advisory-лока загрузки начальных данных
+ADVISORY_LOCK_KEY = 720_220_025
 
 
 # Тестовые данные для учеников
@@ -948,6 +957,33 @@ async def init_test_data():
             raise
 
 
+async def seed_demo_data(force: bool = False) -> bool:
+    """
+    Загружает демо-данные, если маркер набора еще не записан (или force).
+    Возвращает True, если загрузка выполнялась.
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        # Одновременные запуски (несколько контейнеров) выполняются по очереди
+        await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        try:
+            version = await conn.scalar(select(SeedMarker.version).where(SeedMarker.name == SEED_NAME))
+            if not force and version is not None and version >= SEED_VERSION:
+                return False
+            await init_test_data()
+            await conn.execute(
+                pg_insert(SeedMarker)
+                .values(name=SEED_NAME, version=SEED_VERSION)
+                .on_conflict_do_update(
+                    index_elements=[SeedMarker.name],
+                    set_={"version": SEED_VERSION, "applied_at": func.now()},
+                )
+            )
+            return True
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+
+
 if __name__ == "__main__":
-    asyncio.run(init_test_data())
+    asyncio.run(seed_demo_data())
 
@@ -18,8 +18,9 @@ from sqlalchemy import (
     Text,
     Boolean,
     Enum,
-    JSON,
     Float,
+    Index,
+    text,
 )
 from sqlalchemy.orm import (
     DeclarativeBase,
@@ -27,9 +28,17 @@ from sqlalchemy.orm import (
     mapped_column,
     relationship
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 
 from app.db.base import Base
+from app.db.ids import uuid7
+
+# Связи не подгружаются неявно (lazy="raise_on_sql"): в AsyncSession такая
+# подгрузка либо падает с MissingGreenlet, либо делает скрытый запрос.
+# Какие связи нужны, каждый метод репозитория задает планом загрузки.
+#
+# Таблицы с интенсивной вставкой (messages, notifications, submissions,
+# test_attempts, material_progress) получают растущие UUIDv7 вместо uuid4.
 
 
 class UserRole(str, PyEnum):
@@ -80,18 +89,17 @@ class User(Base):
     university: Mapped[Optional[str]] = mapped_column(String(255))
     phone: Mapped[Optional[str]] = mapped_column(String(50))
     timezone: Mapped[Optional[str]] = mapped_column(String(50), default="UTC")
-    refresh_token: Mapped[Optional[str]] = mapped_column(String(500))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
-    profile: Mapped[Optional["UserProfile"]] = relationship("UserProfile", back_populates="user", uselist=False)
-    notifications_settings: Mapped[Optional["NotificationSettings"]] = relationship("NotificationSettings", back_populates="user", uselist=False)
-    student_courses: Mapped[List["StudentCourse"]] = relationship("StudentCourse", back_populates="student")
-    submissions: Mapped[List["Submission"]] = relationship("Submission", back_populates="student")
-    test_attempts: Mapped[List["TestAttempt"]] = relationship("TestAttempt", back_populates="student")
-    notifications: Mapped[List["Notification"]] = relationship("Notification", back_populates="user")
-    messages: Mapped[List["Message"]] = relationship("Message", back_populates="sender")
+    profile: Mapped[Optional["UserProfile"]] = relationship("UserProfile", back_populates="user", uselist=False, lazy="raise_on_sql")
+    notifications_settings: Mapped[Optional["NotificationSettings"]] = relationship("NotificationSettings", back_populates="user", uselist=False, lazy="raise_on_sql")
+    student_courses: Mapped[List["StudentCourse"]] = relationship("StudentCourse", back_populates="student", lazy="raise_on_sql")
+    submissions: Mapped[List["Submission"]] = relationship("Submission", back_populates="student", lazy="raise_on_sql")
+    test_attempts: Mapped[List["TestAttempt"]] = relationship("TestAttempt", back_populates="student", lazy="raise_on_sql")
+    notifications: Mapped[List["Notification"]] = relationship("Notification", back_populates="user", lazy="raise_on_sql")
+    messages: Mapped[List["Message"]] = relationship("Message", back_populates="sender", lazy="raise_on_sql")
 
 
 class UserProfile(Base):
@@ -104,7 +112,7 @@ class UserProfile(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    user: Mapped["User"] = relationship("User", back_populates="profile")
+    user: Mapped["User"] = relationship("User", back_populates="profile", lazy="raise_on_sql")
 
 
 class NotificationSettings(Base):
@@ -121,7 +129,7 @@ class NotificationSettings(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    user: Mapped["User"] = relationship("User", back_populates="notifications_settings")
+    user: Mapped["User"] = relationship("User", back_populates="notifications_settings", lazy="raise_on_sql")
 
 
 class Course(Base):
@@ -135,16 +143,20 @@ class Course(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    teacher: Mapped["User"] = relationship("User", foreign_keys=[teacher_id])
-    student_courses: Mapped[List["StudentCourse"]] = relationship("StudentCourse", back_populates="course")
-    modules: Mapped[List["Module"]] = relationship("Module", back_populates="course", order_by="Module.order")
-    assignments: Mapped[List["Assignment"]] = relationship("Assignment", back_populates="course")
-    tests: Mapped[List["Test"]] = relationship("Test", back_populates="course")
-    chat_channels: Mapped[List["ChatChannel"]] = relationship("ChatChannel", back_populates="course")
+    teacher: Mapped["User"] = relationship("User", foreign_keys=[teacher_id], lazy="raise_on_sql")
+    student_courses: Mapped[List["StudentCourse"]] = relationship("StudentCourse", back_populates="course", lazy="raise_on_sql")
+    modules: Mapped[List["Module"]] = relationship("Module", back_populates="course", order_by="Module.order", lazy="raise_on_sql")
+    assignments: Mapped[List["Assignment"]] = relationship("Assignment", back_populates="course", lazy="raise_on_sql")
+    tests: Mapped[List["Test"]] = relationship("Test", back_populates="course", lazy="raise_on_sql")
+    chat_channels: Mapped[List["ChatChannel"]] = relationship("ChatChannel", back_populates="course", lazy="raise_on_sql")
 
 
 class StudentCourse(Base):
     __tablename__ = "student_courses"
+    __table_args__ = (
+        Index("uq_student_courses_student_course", "student_id", "course_id", unique=True),
+        Index("ix_student_courses_course_id", "course_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     student_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -154,8 +166,8 @@ class StudentCourse(Base):
     enrolled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
-    student: Mapped["User"] = relationship("User", back_populates="student_courses")
-    course: Mapped["Course"] = relationship("Course", back_populates="student_courses")
+    student: Mapped["User"] = relationship("User", back_populates="student_courses", lazy="raise_on_sql")
+    course: Mapped["Course"] = relationship("Course", back_populates="student_courses", lazy="raise_on_sql")
 
 
 class Module(Base):
@@ -168,8 +180,8 @@ class Module(Base):
     order: Mapped[int] = mapped_column(Integer, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
-    course: Mapped["Course"] = relationship("Course", back_populates="modules")
-    materials: Mapped[List["Material"]] = relationship("Material", back_populates="module", order_by="Material.order")
+    course: Mapped["Course"] = relationship("Course", back_populates="modules", lazy="raise_on_sql")
+    materials: Mapped[List["Material"]] = relationship("Material", back_populates="module", order_by="Material.order", lazy="raise_on_sql")
 
 
 class Material(Base):
@@ -185,22 +197,25 @@ class Material(Base):
     order: Mapped[int] = mapped_column(Integer, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
-    module: Mapped["Module"] = relationship("Module", back_populates="materials")
-    material_progress: Mapped[List["MaterialProgress"]] = relationship("MaterialProgress", back_populates="material")
-    assignment: Mapped[Optional["Assignment"]] = relationship("Assignment", back_populates="material", uselist=False)
+    module: Mapped["Module"] = relationship("Module", back_populates="materials", lazy="raise_on_sql")
+    material_progress: Mapped[List["MaterialProgress"]] = relationship("MaterialProgress", back_populates="material", lazy="raise_on_sql")
+    assignment: Mapped[Optional["Assignment"]] = relationship("Assignment", back_populates="material", uselist=False, lazy="raise_on_sql")
 
 
 class MaterialProgress(Base):
     __tablename__ = "material_progress"
+    __table_args__ = (
+        Index("uq_material_progress_student_material", "student_id", "material_id", unique=True),
+    )
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     student_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     material_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("materials.id"), nullable=False)
     progress_percent: Mapped[float] = mapped_column(Float, default=0.0)
     is_completed: Mapped[bool] = mapped_column(Boolean, default=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    material: Mapped["Material"] = relationship("Material", back_populates="material_progress")
+    material: Mapped["Material"] = relationship("Material", back_populates="material_progress", lazy="raise_on_sql")
 
 
 class Assignment(Base):
@@ -216,15 +231,18 @@ class Assignment(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    course: Mapped["Course"] = relationship("Course", back_populates="assignments")
-    material: Mapped[Optional["Material"]] = relationship("Material", back_populates="assignment")
-    submissions: Mapped[List["Submission"]] = relationship("Submission", back_populates="assignment")
+    course: Mapped["Course"] = relationship("Course", back_populates="assignments", lazy="raise_on_sql")
+    material: Mapped[Optional["Material"]] = relationship("Material", back_populates="assignment", lazy="raise_on_sql")
+    submissions: Mapped[List["Submission"]] = relationship("Submission", back_populates="assignment", lazy="raise_on_sql")
 
 
 class Submission(Base):
     __tablename__ = "submissions"
+    __table_args__ = (
+        Index("ix_submissions_assignment_student_submitted", "assignment_id", "student_id", "submitted_at"),
+    )
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     assignment_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("assignments.id"), nullable=False)
     student_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     comment: Mapped[Optional[str]] = mapped_column(Text)
@@ -234,9 +252,9 @@ class Submission(Base):
     submitted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     graded_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
-    assignment: Mapped["Assignment"] = relationship("Assignment", back_populates="submissions")
-    student: Mapped["User"] = relationship("User", back_populates="submissions")
-    files: Mapped[List["SubmissionFile"]] = relationship("SubmissionFile", back_populates="submission")
+    assignment: Mapped["Assignment"] = relationship("Assignment", back_populates="submissions", lazy="raise_on_sql")
+    student: Mapped["User"] = relationship("User", back_populates="submissions", lazy="raise_on_sql")
+    files: Mapped[List["SubmissionFile"]] = relationship("SubmissionFile", back_populates="submission", lazy="raise_on_sql")
 
 
 class SubmissionFile(Base):
@@ -249,7 +267,7 @@ class SubmissionFile(Base):
     file_size: Mapped[Optional[int]] = mapped_column(Integer)
     uploaded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
-    submission: Mapped["Submission"] = relationship("Submission", back_populates="files")
+    submission: Mapped["Submission"] = relationship("Submission", back_populates="files", lazy="raise_on_sql")
 
 
 class Test(Base):
@@ -264,9 +282,9 @@ class Test(Base):
     deadline: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
-    course: Mapped["Course"] = relationship("Course", back_populates="tests")
-    questions: Mapped[List["TestQuestion"]] = relationship("TestQuestion", back_populates="test", order_by="TestQuestion.order")
-    attempts: Mapped[List["TestAttempt"]] = relationship("TestAttempt", back_populates="test")
+    course: Mapped["Course"] = relationship("Course", back_populates="tests", lazy="raise_on_sql")
+    questions: Mapped[List["TestQuestion"]] = relationship("TestQuestion", back_populates="test", order_by="TestQuestion.order", lazy="raise_on_sql")
+    attempts: Mapped[List["TestAttempt"]] = relationship("TestAttempt", back_populates="test", lazy="raise_on_sql")
 
 
 class TestQuestion(Base):
@@ -275,28 +293,31 @@ class TestQuestion(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     test_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("tests.id"), nullable=False)
     question_text: Mapped[str] = mapped_column(Text, nullable=False)
-    options: Mapped[dict] = mapped_column(JSON, nullable=False)  # {"options": [...], "correct": 0}
+    options: Mapped[dict] = mapped_column(JSONB, nullable=False)  # {"options": [...], "correct": 0}
     order: Mapped[int] = mapped_column(Integer, nullable=False)
     points: Mapped[float] = mapped_column(Float, default=1.0)
 
-    test: Mapped["Test"] = relationship("Test", back_populates="questions")
+    test: Mapped["Test"] = relationship("Test", back_populates="questions", lazy="raise_on_sql")
 
 
 class TestAttempt(Base):
     __tablename__ = "test_attempts"
+    __table_args__ = (
+        Index("ix_test_attempts_test_student", "test_id", "student_id"),
+    )
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     test_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("tests.id"), nullable=False)
     student_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    answers: Mapped[dict] = mapped_column(JSON, nullable=False)  # {"question_id": "answer_index"}
+    answers: Mapped[dict] = mapped_column(JSONB, nullable=False)  # {"question_id": "answer_index"}
     score: Mapped[float] = mapped_column(Float, default=0.0)
     max_score: Mapped[float] = mapped_column(Float)
     is_passed: Mapped[bool] = mapped_column(Boolean, default=False)
     started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
-    test: Mapped["Test"] = relationship("Test", back_populates="attempts")
-    student: Mapped["User"] = relationship("User", back_populates="test_attempts")
+    test: Mapped["Test"] = relationship("Test", back_populates="attempts", lazy="raise_on_sql")
+    student: Mapped["User"] = relationship("User", back_populates="test_attempts", lazy="raise_on_sql")
 
 
 class ChatChannel(Base):
@@ -308,34 +329,67 @@ class ChatChannel(Base):
     description: Mapped[Optional[str]] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
-    course: Mapped["Course"] = relationship("Course", back_populates="chat_channels")
-    messages: Mapped[List["Message"]] = relationship("Message", back_populates="channel")
+    course: Mapped["Course"] = relationship("Course", back_populates="chat_channels", lazy="raise_on_sql")
+    messages: Mapped[List["Message"]] = relationship("Message", back_populates="channel", lazy="raise_on_sql")
 
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_channel_created_id", "channel_id", "created_at", "id"),
+        # Помесячные партиции, см. app/db/partitions.py
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     channel_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("chat_channels.id"), nullable=False)
     sender_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Ключ партиционирования входит в первичный ключ (требование Postgres); он же ключ keyset-пагинации
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, server_default=func.now())
 
-    channel: Mapped["ChatChannel"] = relationship("ChatChannel", back_populates="messages")
-    sender: Mapped["User"] = relationship("User", back_populates="messages")
+    channel: Mapped["ChatChannel"] = relationship("ChatChannel", back_populates="messages", lazy="raise_on_sql")
+    sender: Mapped["User"] = relationship("User", back_populates="messages", lazy="raise_on_sql")
 
 
 class Notification(Base):
     __tablename__ = "notifications"
-
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    __table_args__ = (
+        Index("ix_notifications_user_created_id", "user_id", "created_at", "id"),
+        # Фильтр ленты по курсу: NotificationRepository.get_by_user(course_id=...)
+        Index(
+            "ix_notifications_user_course_created_id",
+            "user_id", text("(metadata ->> 'course_id')"), "created_at", "id",
+        ),
+        # Фильтры по остальным ключам metadata через @>
+        Index(
+            "ix_notifications_metadata",
+            "metadata",
+            postgresql_using="gin",
+            postgresql_ops={"metadata": "jsonb_path_ops"},
+        ),
+        # Помесячные партиции, см. app/db/partitions.py
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     type: Mapped[NotificationType] = mapped_column(Enum(NotificationType), nullable=False)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     message: Mapped[str] = mapped_column(Text, nullable=False)
     is_read: Mapped[bool] = mapped_column(Boolean, default=False)
-    metadata_json: Mapped[Optional[dict]] = mapped_column("metadata", JSON)  # для ссылок на курсы, задания и т.д.
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    metadata_json: Mapped[Optional[dict]] = mapped_column("metadata", JSONB)  # для ссылок на курсы, задания и т.д.
+    # Ключ партиционирования входит в первичный ключ (требование Postgres); он же ключ keyset-пагинации
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+
+    user: Mapped["User"] = relationship("User", back_populates="notifications", lazy="raise_on_sql")
+
+
 
-    user: Mapped["User"] = relationship("User", back_populates="notifications")
+# Загруженные наборы начальных данных (python -m app.cli.seed)
+class SeedMarker(Base):
+    __tablename__ = "seed_markers"
 
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    applied_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,108 @@
+"""
+Keyset-пагинация (seek method).
+
+Следующая страница выбирается условием (sort..., id) < (значения последней
+строки) по индексу, который заканчивается на те же колонки, вместо OFFSET:
+страница N стоит столько же, сколько первая, и не "съезжает" при вставке
+новых строк. Колонки ключа должны быть NOT NULL, последняя - уникальной (id).
+
+Курсор непрозрачен для клиента: base64url от JSON со значениями ключа
+последней строки страницы.
+
+Используется там, где список растет без ограничения: сообщения канала и
+уведомления. Остальные списки ограничены одним студентом (его курсы, его
+отправки по заданию) или одним курсом (материалы по модулям) и отдаются
+целиком; для отправок и записей на курс ключ (submitted_at / enrolled_at, id)
+сначала потребует NOT NULL на этих колонках.
+"""
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Generic, List, Optional, Sequence, TypeVar
+from uuid import UUID
+
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exeptions import InvalidCursorException
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _load(column: Any, value: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type in (datetime, UUID):
+        # Курсор приходит от клиента: UUID(123) падает с AttributeError, а не ValueError
+        if not isinstance(value, str):
+            raise ValueError(f"expected a string for {column.key}")
+        return datetime.fromisoformat(value) if python_type is datetime else UUID(value)
+    if isinstance(value, (list, dict)) or value is None:
+        raise ValueError(f"expected a scalar for {column.key}")
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_dump(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor shape mismatch")
+        return tuple(_load(column, value) for column, value in zip(columns, values))
+    except (ValueError, TypeError, AttributeError) as e:
+        # binascii.Error, JSONDecodeError и UnicodeDecodeError - наследники ValueError
+        raise InvalidCursorException() from e
+
+
+async def paginate(
+    session: AsyncSession,
+    query: Select,
+    order_by: Sequence[Any],
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    descending: bool = True,
+) -> Page:
+    """
+    Страница запроса query, упорядоченного по колонкам order_by.
+
+    Берется limit + 1 строка: лишняя строка значит, что есть следующая
+    страница, без отдельного COUNT.
+    """
+    if cursor:
+        key = decode_cursor(cursor, order_by)
+        row = tuple_(*order_by)
+        bound = tuple_(*(literal(value, column.type) for column, value in zip(order_by, key)))
+        query = query.where(row < bound if descending else row > bound)
+        # Отдельное условие по первой колонке: сравнение строк партиции не отсекает,
+        # а по created_at таблицы messages/notifications партиционированы
+        first = literal(key[0], order_by[0].type)
+        query = query.where(order_by[0] <= first if descending else order_by[0] >= first)
+
+    query = query.order_by(*(column.desc() if descending else column.asc() for column in order_by))
+    result = await session.execute(query.limit(limit + 1))
+    items = list(result.scalars().all())
+
+    if len(items) <= limit:
+        return Page(items=items)
+    items = items[:limit]
+    last = items[-1]
+    return Page(items=items, next_cursor=encode_cursor([getattr(last, column.key) for column in order_by]))
@@ -0,0 +1,223 @@
+"""
+Помесячные партиции messages и notifications (PARTITION BY RANGE (created_at)).
+
+PartitionManager раз в PARTITION_MAINTENANCE_INTERVAL_SECONDS:
+- создает партиции на PARTITION_PREMAKE_MONTHS месяцев вперед - DEFAULT-партиции
+  нет, поэтому вставка в месяц без партиции упала бы;
+- отцепляет (DETACH PARTITION ... CONCURRENTLY) партиции старше срока хранения
+  таблицы, а в режиме drop и удаляет их: DROP TABLE вместо многочасового DELETE.
+  Отцепленная таблица переименовывается в {имя}_detached, чтобы ее имя не
+  совпало с партицией, которую когда-нибудь снова создадут за тот же месяц.
+
+Существование партиции определяется по pg_inherits, а не по имени таблицы.
+
+Срок хранения и режим задаются для каждой таблицы отдельно
+(MESSAGES_RETENTION_*, NOTIFICATIONS_RETENTION_*). Воркеры и реплики
+приложения не мешают друг другу - обслуживание идет под advisory-локом.
+Вручную: python -m app.cli.partitions.
+
+Session advisory-лок и DETACH ... CONCURRENTLY требуют одного серверного
+соединения на весь прогон, поэтому через PgBouncer в режиме transaction
+обслуживание не работает: при DB_PGBOUNCER=true нужен прямой адрес
+Postgres в PARTITION_MAINTENANCE_DATABASE_URL, иначе задача не запускается.
+"""
+import asyncio
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.settings import settings
+from app.db.session import engine
+
+logger = structlog.get_logger(__name__)
+
+# Произвольная константа: ключ advisory-лока обслуживания партиций
+ADVISORY_LOCK_KEY = 720_220_022
+
+PARTITION_NAME_RE = re.compile(r"_p(\d{4})_(\d{2})$")
+
+PARTITIONS_SQL = text(
+    "SELECT c.relname, i.inhdetachpending FROM pg_inherits i "
+    "JOIN pg_class c ON c.oid = i.inhrelid "
+    "JOIN pg_class p ON p.oid = i.inhparent "
+    "WHERE p.relname = :table"
+)
+
+DETACHED_SUFFIX = "_detached"
+
+
+@dataclass(frozen=True)
+class PartitionPolicy:
+    table: str
+    retention_months: int  # 0 - хранить всё
+    mode: str  # detach | drop
+
+
+def policies() -> List[PartitionPolicy]:
+    return [
+        PartitionPolicy("messages", settings.MESSAGES_RETENTION_MONTHS, settings.MESSAGES_RETENTION_MODE),
+        PartitionPolicy("notifications", settings.NOTIFICATIONS_RETENTION_MONTHS, settings.NOTIFICATIONS_RETENTION_MODE),
+    ]
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+class PartitionManager:
+    def __init__(self, engine: AsyncEngine, direct: bool = True):
+        self.engine = engine
+        self.direct = direct  # False - engine идет через PgBouncer (transaction), обслуживание невозможно
+        self.last_run: Optional[datetime] = None
+        self.last_report: Dict[str, Any] = {}
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _partitions(self, conn: AsyncConnection, table: str) -> Dict[date, tuple[str, bool]]:
+        """Партиции таблицы по месяцу: (имя, прерванный DETACH CONCURRENTLY)"""
+        result = await conn.execute(PARTITIONS_SQL, {"table": table})
+        partitions = {}
+        for name, detach_pending in result.all():
+            match = PARTITION_NAME_RE.search(name)
+            if match:
+                partitions[date(int(match[1]), int(match[2]), 1)] = (name, detach_pending)
+        return partitions
+
+    async def ensure(self, conn: AsyncConnection, table: str, today: date, dry_run: bool = False) -> List[str]:
+        current = today.replace(day=1)
+        return await self.ensure_range(
+            conn, table, current, add_months(current, settings.PARTITION_PREMAKE_MONTHS), dry_run
+        )
+
+    async def ensure_range(
+        self, conn: AsyncConnection, table: str, first: date, last: date, dry_run: bool = False
+    ) -> List[str]:
+        """Создает недостающие партиции за месяцы с first по last включительно"""
+        existing = await self._partitions(conn, table)
+        created = []
+        month = first.replace(day=1)
+        while month <= last:
+            if month not in existing:
+                name = partition_name(table, month)
+                if not dry_run:
+                    # Таблица с этим именем, но не партиция - отцепленная до переименования
+                    # в *_detached; убираем ее с дороги, иначе вставки за месяц упадут
+                    if await conn.scalar(text("SELECT to_regclass(:name)"), {"name": name}) is not None:
+                        await conn.execute(text(f"ALTER TABLE {name} RENAME TO {name}{DETACHED_SUFFIX}"))
+                        logger.warning("Detached partition table renamed", table=table, partition=name)
+                    await conn.execute(text(
+                        f"CREATE TABLE {name} PARTITION OF {table} "
+                        f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{add_months(month, 1)} 00:00:00+00')"
+                    ))
+                created.append(name)
+            month = add_months(month, 1)
+        return created
+
+    async def apply_retention(
+        self, conn: AsyncConnection, policy: PartitionPolicy, today: date, dry_run: bool = False
+    ) -> List[str]:
+        if policy.retention_months <= 0:
+            return []
+
+        # Хранится текущий месяц и retention_months полных месяцев до него
+        cutoff = add_months(today.replace(day=1), -policy.retention_months)
+        expired = []
+        for month, (name, detach_pending) in sorted((await self._partitions(conn, policy.table)).items()):
+            if add_months(month, 1) > cutoff:
+                continue
+            expired.append(name)
+            if dry_run:
+                continue
+            # Прерванный DETACH CONCURRENTLY оставляет партицию в состоянии pending
+            mode = "FINALIZE" if detach_pending else "CONCURRENTLY"
+            await conn.execute(text(f"ALTER TABLE {policy.table} DETACH PARTITION {name} {mode}"))
+            if policy.mode == "drop":
+                await conn.execute(text(f"DROP TABLE {name}"))
+            else:
+                await conn.execute(text(f"ALTER TABLE {name} RENAME TO {name}{DETACHED_SUFFIX}"))
+            logger.info("Partition expired", table=policy.table, partition=name, mode=policy.mode)
+        return expired
+
+    async def run_once(self, dry_run: bool = False) -> Dict[str, Any]:
+        today = datetime.now(timezone.utc).date()
+        report: Dict[str, Any] = {}
+        if not self.direct:
+            raise RuntimeError(
+                "Partition maintenance needs a direct Postgres connection: "
+                "set PARTITION_MAINTENANCE_DATABASE_URL when DB_PGBOUNCER=true"
+            )
+        # DETACH ... CONCURRENTLY нельзя выполнять внутри транзакции
+        async with self.engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            locked = await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+            if not locked:
+                return {"skipped": "maintenance is running elsewhere"}
+            try:
+                for policy in policies():
+                    report[policy.table] = {
+                        "created": await self.ensure(conn, policy.table, today, dry_run),
+                        "expired": await self.apply_retention(conn, policy, today, dry_run),
+                        "retention_months": policy.retention_months,
+                        "mode": policy.mode,
+                    }
+            finally:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        return report
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.last_report = await self.run_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error("Partition maintenance failed", error=str(e))
+            self.last_run = datetime.now(timezone.utc)
+            await asyncio.sleep(settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+
+    async def start(self) -> None:
+        if not settings.PARTITION_MAINTENANCE_ENABLED or self._task is not None:
+            return
+        if not self.direct:
+            logger.error("Partition maintenance disabled: PARTITION_MAINTENANCE_DATABASE_URL is required with DB_PGBOUNCER")
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.PARTITION_MAINTENANCE_ENABLED,
+            "direct_connection": self.direct,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_error": self.last_error,
+            "last_report": self.last_report,
+        }
+
+
+def _create_manager() -> PartitionManager:
+    if settings.PARTITION_MAINTENANCE_DATABASE_URL:
+        # Короткие прогоны раз в несколько часов - пул не нужен
+        return PartitionManager(create_async_engine(settings.PARTITION_MAINTENANCE_DATABASE_URL, poolclass=NullPool))
+    return PartitionManager(engine, direct=not settings.DB_PGBOUNCER)
+
+
+partition_manager = _create_manager()
@@ -0,0 +1,72 @@
+"""
+Пул соединений SQLAlchemy с телеметрией: сколько ждали свободное соединение
+и сколько раз не дождались (pool_timeout).
+
+Вместе с size/checkedout/overflow это позволяет подбирать DB_POOL_SIZE и
+число воркеров по данным, а не наугад.
+"""
+import time
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolTelemetry:
+    # Порог, начиная с которого считаем, что запрос реально ждал соединение
+    WAIT_THRESHOLD_SECONDS = 0.001
+
+    def __init__(self):
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def observe(self, waited: float) -> None:
+        self.checkouts += 1
+        if waited >= self.WAIT_THRESHOLD_SECONDS:
+            self.waits += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "waits": self.waits,
+            "wait_ms_avg": round(self.wait_seconds_total / self.waits * 1000, 3) if self.waits else 0.0,
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            "timeouts": self.timeouts,
+        }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.telemetry = PoolTelemetry()
+
+    def recreate(self):
+        # dispose() пересоздает пул - счетчики переносим в новый экземпляр
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.telemetry.timeouts += 1
+            raise
+        self.telemetry.observe(time.perf_counter() - started)
+        return connection
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            **self.telemetry.stats(),
+        }
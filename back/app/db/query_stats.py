@@ -0,0 +1,124 @@
+"""
+Учет SQL-запросов в рамках HTTP-запроса.
+
+Хуки движка (before/after_cursor_execute) записывают число запросов и время
+в БД в QueryStats текущего контекста. QueryStatsMiddleware открывает такой
+контекст на каждый запрос, отдает итог в заголовке Server-Timing и в логе
+и предупреждает о повторяющихся одинаковых запросах (признак N+1).
+
+Бюджет запросов для эндпоинта:
+
+    @router.get("/calendar", dependencies=[Depends(query_budget(6))])
+
+В тестах (QUERY_BUDGET_STRICT=true) превышение бюджета - ошибка, в проде - warning.
+Для кода в том же asyncio-таске (httpx.AsyncClient + ASGITransport) есть
+assert_max_queries:
+
+    with assert_max_queries(6):
+        await client.get("/api/calendar")
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.parent = parent
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        stats = self
+        # Вложенные контексты (assert_max_queries вокруг запроса) видят все запросы
+        while stats is not None:
+            stats.count += 1
+            stats.duration += duration
+            stats.statements[statement] += 1
+            stats = stats.parent
+
+    @property
+    def duration_ms(self) -> float:
+        return round(self.duration * 1000, 2)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration_ms};desc="{self.count} queries"'
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def collect_queries() -> Iterator[QueryStats]:
+    stats = QueryStats(parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+    with collect_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(f"Expected at most {max_queries} queries, got {stats.count}")
+
+
+def query_budget(max_queries: int):
+    """Зависимость роута: проверяет, что эндпоинт уложился в max_queries запросов"""
+
+    async def dep():
+        stats = current_stats()
+        before = stats.count if stats is not None else 0
+        yield
+        if stats is None:
+            return
+        used = stats.count - before
+        if used <= max_queries:
+            return
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(f"Expected at most {max_queries} queries, got {used}")
+        logger.warning("Query budget exceeded", budget=max_queries, queries=used)
+
+    return dep
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "_query_stats_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,140 @@
+"""
+Маршрутизация чтений на реплику Postgres.
+
+GET-эндпоинты берут сессию через get_read_session и читают с реплики, кроме случаев:
+- реплика не настроена или помечена нездоровой (недоступна, отстает больше
+  DB_REPLICA_MAX_LAG_SECONDS) - читаем с primary;
+- пользователь только что что-то записал - его чтения DB_REPLICA_STICKY_SECONDS
+  идут в primary, чтобы он видел свои изменения (read-your-writes). Окно
+  не короче допустимого отставания плюс интервал проверки - это проверяется
+  при загрузке настроек.
+
+Отметка о записи хранится в Redis (общая для воркеров) и локально у воркера,
+который обработал запись.
+"""
+import asyncio
+from typing import Any, Optional
+
+import structlog
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.cache import TTLCache
+from app.core.redis import get_redis
+from app.core.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+STICKY_KEY = "db:sticky:{user_id}"
+
+# Отставание реплики; если все полученное WAL уже применено, реплика догнала primary
+# (на простаивающем primary pg_last_xact_replay_timestamp стареет сам по себе)
+LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaRouter:
+    def __init__(self, engine: Optional[AsyncEngine]):
+        self.engine = engine
+        self.healthy = engine is not None
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._sticky = TTLCache(maxsize=settings.DB_REPLICA_STICKY_MAXSIZE, ttl=settings.DB_REPLICA_STICKY_SECONDS)
+        self._monitor: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.engine is not None
+
+    # --- read-your-writes ---
+
+    async def mark_write(self, user_id: Any) -> None:
+        """Запоминает, что пользователь только что записал данные"""
+        if not self.enabled or user_id is None:
+            return
+        self._sticky.set(str(user_id), True)
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(STICKY_KEY.format(user_id=user_id), 1, ex=settings.DB_REPLICA_STICKY_SECONDS)
+        except RedisError as e:
+            logger.warning("Failed to mark replica stickiness", error=str(e))
+
+    async def _is_sticky(self, user_id: str) -> bool:
+        if self._sticky.get(user_id):
+            return True
+        redis = get_redis()
+        if redis is None:
+            return False
+        try:
+            return bool(await redis.exists(STICKY_KEY.format(user_id=user_id)))
+        except RedisError:
+            # Не знаем, писал ли пользователь - безопаснее прочитать с primary
+            return True
+
+    async def use_replica(self, user_id: Optional[Any]) -> bool:
+        if not self.enabled or not self.healthy:
+            return False
+        if user_id is not None and await self._is_sticky(str(user_id)):
+            return False
+        return True
+
+    # --- здоровье реплики ---
+
+    def mark_down(self, reason: str) -> None:
+        if self.healthy:
+            logger.warning("Read replica marked unhealthy, reading from primary", reason=reason)
+        self.healthy = False
+        self.last_error = reason
+
+    async def check(self) -> None:
+        try:
+            async with self.engine.connect() as conn:
+                lag = await asyncio.wait_for(
+                    conn.scalar(LAG_SQL), timeout=settings.DB_REPLICA_CHECK_INTERVAL_SECONDS
+                )
+        except Exception as e:
+            self.lag_seconds = None
+            self.mark_down(f"check failed: {e}")
+            return
+
+        self.lag_seconds = float(lag or 0)
+        if self.lag_seconds > settings.DB_REPLICA_MAX_LAG_SECONDS:
+            self.mark_down(f"lag {self.lag_seconds:.1f}s")
+        elif not self.healthy:
+            logger.info("Read replica is healthy again", lag_seconds=self.lag_seconds)
+            self.healthy = True
+            self.last_error = None
+
+    async def _run_monitor(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(settings.DB_REPLICA_CHECK_INTERVAL_SECONDS)
+
+    async def start(self) -> None:
+        if self.enabled and self._monitor is None:
+            self._monitor = asyncio.create_task(self._run_monitor())
+
+    async def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+        if self.engine is not None:
+            await self.engine.dispose()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "last_error": self.last_error,
+            "sticky_users_local": len(self._sticky),
+        }
@@ -1,14 +1,49 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from app.core.settings import settings
 from collections.abc import AsyncGenerator
+from uuid import uuid4
+
+from fastapi import Request
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+
+from app.core.middleware import get_principal
+from app.core.settings import settings
+from app.db.pool import InstrumentedPool
+from app.db import query_stats, slow_query, uow
+from app.db.replica import ReplicaRouter
+
+
+def _connect_args() -> dict:
+    if not settings.DB_PGBOUNCER:
+        return {}
+    # PgBouncer в режиме transaction: соседние транзакции одного клиента попадают
+    # на разные серверные соединения, поэтому кэш prepared statements asyncpg
+    # выключаем, а имена делаем уникальными, чтобы они не конфликтовали
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
 
-engine = create_async_engine(
-    settings.ASYNC_DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    echo=False,  
-)
+
+def create_engine(url: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args=_connect_args(),
+        echo=False,
+    )
+    # Счетчик запросов и времени в БД на HTTP-запрос, журнал медленных запросов
+    query_stats.instrument_engine(engine)
+    slow_query.instrument_engine(engine)
+    return engine
+
+
+engine = create_engine(settings.ASYNC_DATABASE_URL)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -16,9 +51,58 @@ AsyncSessionLocal = async_sessionmaker(
     class_=AsyncSession,
 )
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
+# Реплика для чтения (необязательна)
+replica_engine = create_engine(settings.ASYNC_DATABASE_REPLICA_URL) if settings.ASYNC_DATABASE_REPLICA_URL else None
+
+ReplicaSessionLocal = async_sessionmaker(
+    bind=replica_engine,
+    expire_on_commit=False,
+    class_=AsyncSession,
+) if replica_engine is not None else None
+
+replica_router = ReplicaRouter(replica_engine)
+
+# Методы, которые ничего не меняют - после них отметку о записи не ставим
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def _principal_user_id(request: Request):
+    principal = get_principal(request.scope)
+    return principal["user_id"] if principal else None
+
+
+def pool_stats() -> dict:
+    stats = {"primary": engine.pool.stats()}
+    if replica_engine is not None:
+        stats["replica"] = replica_engine.pool.stats()
+    return stats
+
+
+async def get_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Единица работы: одна транзакция на запрос, коммит после эндпоинта, откат при ошибке"""
     async with AsyncSessionLocal() as session:
         try:
             yield session
-        finally:
-            await session.close()
+        except Exception:
+            await uow.rollback(session)
+            raise
+        await uow.commit(session)
+    # Запись пользователя - следующие несколько секунд его чтения идут в primary
+    if request.method not in SAFE_METHODS:
+        await replica_router.mark_write(_principal_user_id(request))
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Сессия только для чтения: реплика, если она здорова и пользователь недавно не писал"""
+    if not await replica_router.use_replica(_principal_user_id(request)):
+        async with AsyncSessionLocal() as session:
+            yield session
+        return
+
+    async with ReplicaSessionLocal() as session:
+        try:
+            yield session
+        except DBAPIError as e:
+            if e.connection_invalidated:
+                replica_router.mark_down(f"connection lost: {e.orig}")
+            raise
@@ -0,0 +1,159 @@
+"""
+Журнал медленных запросов.
+
+Запрос дольше SLOW_QUERY_THRESHOLD_MS попадает в отдельный ротируемый
+файл (JSON в строку): SQL, типы параметров (без значений - там бывают
+персональные данные), метод репозитория, из которого он вызван, и план
+EXPLAIN (FORMAT JSON) без выполнения. По такому журналу недостающие индексы
+находятся без воспроизведения нагрузки.
+
+EXPLAIN выполняется на том же соединении внутри SAVEPOINT, чтобы ошибка
+не сломала транзакцию запроса, и не чаще раза в
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS для одного и того же SQL.
+"""
+import hashlib
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Optional
+
+import structlog
+from greenlet import getcurrent
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.cache import TTLCache
+from app.core.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+
+_explained = TTLCache(maxsize=1000, ttl=settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS)
+_file_logger: Optional[logging.Logger] = None
+
+
+def _get_file_logger() -> logging.Logger:
+    global _file_logger
+    if _file_logger is None:
+        path = Path(settings.SLOW_QUERY_LOG_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+            backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        file_logger = logging.getLogger("app.slow_queries")
+        file_logger.addHandler(handler)
+        file_logger.setLevel(logging.INFO)
+        file_logger.propagate = False
+        _file_logger = file_logger
+    return _file_logger
+
+
+def _parameter_shapes(parameters: Any) -> Any:
+    def shape(value: Any) -> str:
+        if isinstance(value, (list, tuple)):
+            return f"{type(value).__name__}[{len(value)}]"
+        return type(value).__name__
+
+    if isinstance(parameters, dict):
+        return {key: shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [shape(value) for value in parameters]
+    return None
+
+
+def _caller() -> Optional[str]:
+    """Метод репозитория (или эндпоинт), из которого пришел запрос"""
+    # Хук выполняется в greenlet SQLAlchemy; корутины вызывающего кода
+    # лежат в стеке родительского greenlet
+    frames = [sys._getframe(1)]
+    parent = getcurrent().parent
+    if parent is not None and parent.gr_frame is not None:
+        frames.append(parent.gr_frame)
+
+    fallback = None
+    for frame in frames:
+        while frame is not None:
+            module = frame.f_globals.get("__name__", "")
+            if module.startswith("app.repo."):
+                owner = frame.f_locals.get("self")
+                owner_name = type(owner).__name__ if owner is not None else module
+                return f"{owner_name}.{frame.f_code.co_name}"
+            if fallback is None and module.startswith("app.") and not module.startswith("app.db."):
+                fallback = f"{module}.{frame.f_code.co_name}"
+            frame = frame.f_back
+    return fallback
+
+
+def _explain(conn, statement: str, parameters: Any) -> Optional[Any]:
+    cursor = conn.connection.cursor()
+    savepoint = conn.in_transaction()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE off, FORMAT JSON) {statement}", parameters)
+            plan = cursor.fetchone()[0]
+        except Exception as e:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            logger.warning("Failed to EXPLAIN slow query", error=str(e))
+            return None
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return json.loads(plan) if isinstance(plan, str) else plan
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._slow_query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_slow_query_started", None)
+    if started is None:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    if duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+
+    caller = _caller()
+    record = {
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "duration_ms": round(duration_ms, 2),
+        "caller": caller,
+        "statement": statement,
+        "parameters": _parameter_shapes(parameters),
+        "executemany": executemany,
+        "plan": None,
+    }
+
+    digest = hashlib.sha1(statement.encode("utf-8")).hexdigest()
+    if (
+        settings.SLOW_QUERY_EXPLAIN
+        and not executemany
+        and statement.lstrip().lower().startswith(EXPLAINABLE)
+        and _explained.get(digest) is None
+    ):
+        _explained.set(digest, True)
+        record["plan"] = _explain(conn, statement, parameters)
+
+    _get_file_logger().info(json.dumps(record, ensure_ascii=False, default=str))
+    logger.warning("Slow query", duration_ms=record["duration_ms"], caller=caller, statement_hash=digest[:12])
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    if settings.SLOW_QUERY_THRESHOLD_MS <= 0:
+        return
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
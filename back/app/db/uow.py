@@ -0,0 +1,36 @@
+"""
+Единица работы на HTTP-запрос.
+
+get_session открывает одну транзакцию на запрос: репозитории только
+выполняют запросы и flush, а коммит (или откат при исключении) делается
+один раз в конце. Действия, которые можно выполнять только после коммита
+(сброс кэшей, публикации), регистрируются через on_commit.
+"""
+from typing import Awaitable, Callable
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = structlog.get_logger(__name__)
+
+ON_COMMIT_KEY = "on_commit"
+
+
+def on_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Откладывает callback до успешного коммита транзакции сессии"""
+    session.info.setdefault(ON_COMMIT_KEY, []).append(callback)
+
+
+async def commit(session: AsyncSession) -> None:
+    await session.commit()
+    for callback in session.info.pop(ON_COMMIT_KEY, []):
+        try:
+            await callback()
+        except Exception as e:
+            # Данные уже закоммичены - ошибку побочного действия только логируем
+            logger.error("On-commit callback failed", error=str(e))
+
+
+async def rollback(session: AsyncSession) -> None:
+    session.info.pop(ON_COMMIT_KEY, None)
+    await session.rollback()
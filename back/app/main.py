@@ -5,8 +5,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from fastapi import HTTPException
-from app.db.session import engine
-from app.db.base import Base
+from app.core.redis import close_redis
+from app.core.middleware import AuthMiddleware, QueryStatsMiddleware, QUERY_STATS_SCOPE_KEY
+from app.core.revocation import revocation_list
+from app.db.partitions import partition_manager
+from app.db.session import replica_router
+from app.services.password_service import password_service
 from app.api import (
     health_router,
     auth_router,
@@ -19,6 +23,8 @@ from app.api import (
     grades_router,
     calendar_router,
     notifications_router,
+    metrics_router,
+    well_known_router,
 )
 
 # Настройка структурированного логирования
@@ -48,23 +54,26 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting application")
     
-    # Создаем таблицы
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    
-    logger.info("Database tables created")
-    
-    # Инициализируем тестовые данные
-    try:
-        from app.db.init_data import init_test_data
-        await init_test_data()
-        logger.info("Test data initialized")
-    except Exception as e:
-        logger.warning(f"Failed to initialize test data: {e}")
-    
+    # Схема БД управляется миграциями (alembic upgrade head), демо-данные
+    # загружает отдельная команда (python -m app.cli.seed) - воркер их не трогает
+
+    # Список отзыва токенов: загрузка и подписка на изменения от других воркеров
+    await revocation_list.start()
+
+    # Проверка здоровья и отставания реплики для чтения
+    await replica_router.start()
+
+    # Партиции messages/notifications на месяцы вперед и срок хранения
+    await partition_manager.start()
+
     yield
     # Shutdown
     logger.info("Shutting down application")
+    await revocation_list.stop()
+    await partition_manager.stop()
+    await replica_router.stop()
+    password_service.shutdown()
+    await close_redis()
 
 
 app = FastAPI(
@@ -80,6 +89,12 @@ origins = [
     "http://127.0.0.1:5173",
 ]
 
+# Проверка bearer-токена один раз на запрос (principal кладется в scope)
+app.add_middleware(AuthMiddleware)
+
+# Число SQL-запросов и время в БД: Server-Timing и поля лога запроса
+app.add_middleware(QueryStatsMiddleware)
+
 # CORS настройки
 app.add_middleware(
     CORSMiddleware,
@@ -99,11 +114,14 @@ async def log_requests(request, call_next):
         client=request.client.host if request.client else None
     )
     response = await call_next(request)
+    query_stats = request.scope.get(QUERY_STATS_SCOPE_KEY)
     logger.info(
         "Request completed",
         method=request.method,
         path=request.url.path,
-        status_code=response.status_code
+        status_code=response.status_code,
+        db_queries=query_stats.count if query_stats else None,
+        db_time_ms=query_stats.duration_ms if query_stats else None
     )
     return response
 
@@ -118,7 +136,8 @@ async def http_exception_handler(request, exc: HTTPException):
     )
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=exc.headers  # Retry-After, WWW-Authenticate
     )
 
 @app.exception_handler(Exception)
@@ -146,6 +165,8 @@ app.include_router(chat_router)
 app.include_router(grades_router)
 app.include_router(calendar_router)
 app.include_router(notifications_router)
+app.include_router(metrics_router)
+app.include_router(well_known_router)
 
 
 @app.get("/")
@@ -1,12 +1,29 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.db.models import Assignment, Submission, SubmissionFile
 from app.repo.base import BaseRepository
 
+# Планы загрузки: остальные связи при обращении падают (lazy="raise_on_sql")
+ASSIGNMENT_DETAIL = (
+    joinedload(Assignment.course),
+    joinedload(Assignment.material),
+)
+
+SUBMISSION_WITH_FILES = (
+    selectinload(Submission.files),
+)
+
+SUBMISSION_DETAIL = (
+    joinedload(Submission.assignment),
+    joinedload(Submission.student),
+    selectinload(Submission.files),
+)
+
 
 class AssignmentRepository(BaseRepository[Assignment]):
     def __init__(self, session: AsyncSession):
@@ -15,10 +32,7 @@ class AssignmentRepository(BaseRepository[Assignment]):
     async def get_by_id_with_relations(self, assignment_id: UUID) -> Optional[Assignment]:
         result = await self.session.execute(
             select(Assignment)
-            .options(
-                selectinload(Assignment.course),
-                selectinload(Assignment.material)
-            )
+            .options(*ASSIGNMENT_DETAIL)
             .where(Assignment.id == assignment_id)
         )
         return result.scalar_one_or_none()
@@ -32,6 +46,25 @@ class AssignmentRepository(BaseRepository[Assignment]):
         return list(result.scalars().all())
 
 
+    async def get_by_courses_with_deadline(
+        self,
+        course_ids: List[UUID],
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None
+    ) -> List[Assignment]:
+        """Задания с дедлайном в периоде по нескольким курсам одним запросом"""
+        query = select(Assignment).where(
+            Assignment.course_id.in_(course_ids),
+            Assignment.deadline.is_not(None)
+        )
+        if from_date:
+            query = query.where(Assignment.deadline >= from_date)
+        if to_date:
+            query = query.where(Assignment.deadline <= to_date)
+        result = await self.session.execute(query.order_by(Assignment.deadline))
+        return list(result.scalars().all())
+
+
 class SubmissionRepository(BaseRepository[Submission]):
     def __init__(self, session: AsyncSession):
         super().__init__(Submission, session)
@@ -43,7 +76,7 @@ class SubmissionRepository(BaseRepository[Submission]):
     ) -> List[Submission]:
         result = await self.session.execute(
             select(Submission)
-            .options(selectinload(Submission.files))
+            .options(*SUBMISSION_WITH_FILES)
             .where(
                 Submission.assignment_id == assignment_id,
                 Submission.student_id == student_id
@@ -52,14 +85,29 @@ class SubmissionRepository(BaseRepository[Submission]):
         )
         return list(result.scalars().all())
 
-    async def get_by_id_with_relations(self, submission_id: UUID) -> Optional[Submission]:
+    async def get_latest_by_assignments(
+        self,
+        assignment_ids: List[UUID],
+        student_id: UUID
+    ) -> Dict[UUID, Submission]:
+        """Последняя отправка студента по каждому заданию одним запросом"""
+        if not assignment_ids:
+            return {}
         result = await self.session.execute(
             select(Submission)
-            .options(
-                selectinload(Submission.assignment),
-                selectinload(Submission.student),
-                selectinload(Submission.files)
+            .where(
+                Submission.assignment_id.in_(assignment_ids),
+                Submission.student_id == student_id
             )
+            .distinct(Submission.assignment_id)
+            .order_by(Submission.assignment_id, Submission.submitted_at.desc())
+        )
+        return {submission.assignment_id: submission for submission in result.scalars().all()}
+
+    async def get_by_id_with_relations(self, submission_id: UUID) -> Optional[Submission]:
+        result = await self.session.execute(
+            select(Submission)
+            .options(*SUBMISSION_DETAIL)
             .where(Submission.id == submission_id)
         )
         return result.scalar_one_or_none()
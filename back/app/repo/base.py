@@ -1,10 +1,12 @@
-from typing import Generic, TypeVar, Optional, List
+from typing import Any, Generic, Iterable, TypeVar, Optional, List, Sequence
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import Select, column, select, update, delete, insert, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 
 from app.db.base import Base
+from app.db.pagination import Page, paginate
 
 ModelType = TypeVar("ModelType", bound=Base)
 
@@ -20,29 +22,122 @@ class BaseRepository(Generic[ModelType]):
         )
         return result.scalar_one_or_none()
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
+    async def get_many(self, ids: Iterable[UUID]) -> List[ModelType]:
+        """Несколько строк по id одним запросом (порядок не гарантируется)"""
+        ids = list(ids)
+        if not ids:
+            return []
         result = await self.session.execute(
-            select(self.model).offset(skip).limit(limit)
+            select(self.model).where(self.model.id.in_(ids))
         )
         return list(result.scalars().all())
 
+    async def paginate(
+        self,
+        query: Select,
+        order_by: Sequence[Any] = (),
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        descending: bool = True,
+    ) -> Page[ModelType]:
+        """Keyset-страница query по (order_by..., id); id делает ключ уникальным"""
+        return await paginate(
+            self.session, query, [*order_by, self.model.id], cursor, limit, descending
+        )
+
     async def create(self, obj: ModelType) -> ModelType:
+        # INSERT ... RETURNING (eager_defaults) - refresh не нужен;
+        # коммит делает единица работы запроса (get_session)
         self.session.add(obj)
-        await self.session.commit()
-        await self.session.refresh(obj)
+        await self.session.flush()
         return obj
 
     async def update(self, id: UUID, **kwargs) -> Optional[ModelType]:
-        await self.session.execute(
-            update(self.model).where(self.model.id == id).values(**kwargs)
+        return await self._update_where(self.model.id == id, kwargs)
+
+    async def _update_where(self, condition, values: dict[str, Any]) -> Optional[ModelType]:
+        """UPDATE ... RETURNING: измененная строка приходит тем же запросом"""
+        if not values:
+            result = await self.session.execute(select(self.model).where(condition))
+            return result.scalars().first()
+        result = await self.session.scalars(
+            update(self.model).where(condition).values(**values).returning(self.model),
+            execution_options={"populate_existing": True}
         )
-        await self.session.commit()
-        return await self.get_by_id(id)
+        return result.first()
 
     async def delete(self, id: UUID) -> bool:
         result = await self.session.execute(
             delete(self.model).where(self.model.id == id)
         )
-        await self.session.commit()
         return result.rowcount > 0
 
+    # --- пакетные операции: один запрос на пачку, строки возвращаются через RETURNING ---
+
+    async def bulk_create(self, rows: Sequence[dict[str, Any]]) -> List[ModelType]:
+        """INSERT пачки строк; Python-умолчания модели (id и т.п.) заполняются"""
+        if not rows:
+            return []
+        result = await self.session.scalars(
+            insert(self.model).returning(self.model),
+            list(rows)
+        )
+        return list(result.all())
+
+    async def bulk_update(self, rows: Sequence[dict[str, Any]]) -> List[ModelType]:
+        """
+        UPDATE пачки строк по id одним запросом через join с VALUES.
+        У всех строк должен быть одинаковый набор полей, включая "id".
+        """
+        if not rows:
+            return []
+        table = self.model.__table__
+        fields = [name for name in rows[0] if name != "id"]
+        data = values(
+            *(column(name, table.c[name].type) for name in ["id", *fields]),
+            name="data"
+        ).data([tuple(row[name] for name in ["id", *fields]) for row in rows])
+
+        stmt = (
+            update(self.model)
+            .where(self.model.id == data.c.id)
+            .values({name: data.c[name] for name in fields})
+            .returning(self.model)
+            .execution_options(synchronize_session="fetch")
+        )
+        result = await self.session.scalars(stmt)
+        return list(result.all())
+
+    async def upsert(
+        self,
+        rows: Sequence[dict[str, Any]],
+        conflict_columns: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None
+    ) -> List[ModelType]:
+        """
+        INSERT ... ON CONFLICT (conflict_columns) DO UPDATE одним запросом.
+        По умолчанию обновляются все переданные поля, кроме ключа конфликта и id;
+        с пустым update_columns - DO NOTHING (вернутся только вставленные строки).
+        Для conflict_columns нужен уникальный индекс.
+        """
+        if not rows:
+            return []
+        if update_columns is None:
+            update_columns = [name for name in rows[0] if name not in conflict_columns and name != "id"]
+
+        stmt = pg_insert(self.model).values(list(rows))
+        if update_columns:
+            set_ = {name: stmt.excluded[name] for name in update_columns}
+            # onupdate (updated_at) сам в ON CONFLICT не попадает
+            for col in self.model.__table__.columns:
+                if col.onupdate is not None and col.name not in set_:
+                    set_[col.name] = col.onupdate.arg
+            stmt = stmt.on_conflict_do_update(index_elements=list(conflict_columns), set_=set_)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+
+        result = await self.session.scalars(
+            stmt.returning(self.model),
+            execution_options={"populate_existing": True}
+        )
+        return list(result.all())
@@ -2,11 +2,17 @@ from typing import List, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, text
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 
-from app.db.models import ChatChannel, Message
+from app.db.models import ChatChannel, Message, User
+from app.db.pagination import Page
 from app.repo.base import BaseRepository
 
+# План загрузки: лента сообщений - только то, что нужно для имени отправителя
+MESSAGES_WITH_SENDER = (
+    joinedload(Message.sender).load_only(User.first_name, User.last_name, User.email, raiseload=True),
+)
+
 
 class ChatChannelRepository(BaseRepository[ChatChannel]):
     def __init__(self, session: AsyncSession):
@@ -25,23 +31,25 @@ class ChatChannelRepository(BaseRepository[ChatChannel]):
         course_id: UUID, 
         user_id: UUID
     ) -> List[dict]:
-        # Получаем каналы с количеством непрочитанных сообщений
+        # Каналы и непрочитанные по всем каналам курса - два запроса вместо 1 + N.
+        # Условие по created_at отсекает партиции messages старше 30 дней
         channels = await self.get_by_course(course_id)
-        result = []
-        for channel in channels:
-            unread_count = await self.session.execute(
-                select(func.count(Message.id))
-                .where(
-                    Message.channel_id == channel.id,
-                    Message.sender_id != user_id,
-                    Message.created_at > func.now() - text("INTERVAL '30 days'")  # за последние 30 дней
-                )
+        if not channels:
+            return []
+        counts = await self.session.execute(
+            select(Message.channel_id, func.count(Message.id))
+            .where(
+                Message.channel_id.in_([channel.id for channel in channels]),
+                Message.sender_id != user_id,
+                Message.created_at > func.now() - text("INTERVAL '30 days'")  # за последние 30 дней
             )
-            result.append({
-                "channel": channel,
-                "unread_count": unread_count.scalar_one() or 0
-            })
-        return result
+            .group_by(Message.channel_id)
+        )
+        unread = dict(counts.all())
+        return [
+            {"channel": channel, "unread_count": unread.get(channel.id, 0)}
+            for channel in channels
+        ]
 
 
 class MessageRepository(BaseRepository[Message]):
@@ -51,18 +59,15 @@ class MessageRepository(BaseRepository[Message]):
     async def get_by_channel(
         self, 
         channel_id: UUID, 
-        cursor: Optional[UUID] = None, 
+        cursor: Optional[str] = None, 
         limit: int = 50
-    ) -> List[Message]:
-        query = select(Message).options(
-            selectinload(Message.sender)
-        ).where(Message.channel_id == channel_id)
-        
-        if cursor:
-            query = query.where(Message.id < cursor)
-        
-        query = query.order_by(Message.created_at.desc()).limit(limit)
-        
-        result = await self.session.execute(query)
-        return list(result.scalars().all())
+    ) -> Page[Message]:
+        # От новых к старым по (created_at, id): сравнение случайных uuid4
+        # само по себе не давало ни порядка, ни использования индекса
+        return await self.paginate(
+            select(Message).options(*MESSAGES_WITH_SENDER).where(Message.channel_id == channel_id),
+            [Message.created_at],
+            cursor,
+            limit
+        )
 
@@ -2,11 +2,27 @@ from typing import List, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
-from app.db.models import Course, StudentCourse, CourseStatus
+from app.db.models import Assignment, Course, CourseStatus, Module, StudentCourse, Test, User
 from app.repo.base import BaseRepository
 
+# Планы загрузки: остальные связи и колонки вне load_only при обращении падают
+_TEACHER_NAME = (User.first_name, User.last_name)
+
+# Обзор курса: преподаватель, число модулей и дедлайны заданий/тестов
+COURSE_OVERVIEW = (
+    joinedload(Course.teacher).load_only(*_TEACHER_NAME, raiseload=True),
+    selectinload(Course.modules).load_only(Module.id, raiseload=True),
+    selectinload(Course.assignments).load_only(Assignment.id, Assignment.title, Assignment.deadline, raiseload=True),
+    selectinload(Course.tests).load_only(Test.id, Test.title, Test.deadline, raiseload=True),
+)
+
+# Список курсов студента: курс и имя преподавателя одним запросом (many-to-one - JOIN)
+STUDENT_COURSES = (
+    joinedload(StudentCourse.course).joinedload(Course.teacher).load_only(*_TEACHER_NAME, raiseload=True),
+)
+
 
 class CourseRepository(BaseRepository[Course]):
     def __init__(self, session: AsyncSession):
@@ -15,12 +31,7 @@ class CourseRepository(BaseRepository[Course]):
     async def get_by_id_with_relations(self, course_id: UUID) -> Optional[Course]:
         result = await self.session.execute(
             select(Course)
-            .options(
-                selectinload(Course.teacher),
-                selectinload(Course.modules).selectinload("materials"),
-                selectinload(Course.assignments),
-                selectinload(Course.tests)
-            )
+            .options(*COURSE_OVERVIEW)
             .where(Course.id == course_id)
         )
         return result.scalar_one_or_none()
@@ -34,9 +45,7 @@ class StudentCourseRepository(BaseRepository[StudentCourse]):
         student_id: UUID, 
         status: Optional[CourseStatus] = None
     ) -> List[StudentCourse]:
-        query = select(StudentCourse).options(
-            selectinload(StudentCourse.course).selectinload(Course.teacher)
-        ).where(StudentCourse.student_id == student_id)
+        query = select(StudentCourse).options(*STUDENT_COURSES).where(StudentCourse.student_id == student_id)
         
         if status:
             query = query.where(StudentCourse.status == status)
@@ -2,11 +2,24 @@ from typing import List, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.db.models import Material, MaterialProgress, Module
 from app.repo.base import BaseRepository
 
+# Планы загрузки: остальные связи при обращении падают (lazy="raise_on_sql")
+
+# Карточка материала: модуль с курсом и связанное задание - один запрос с JOIN
+MATERIAL_DETAIL = (
+    joinedload(Material.module).joinedload(Module.course),
+    joinedload(Material.assignment),
+)
+
+# Структура курса: модули и их материалы
+COURSE_MODULES = (
+    selectinload(Module.materials),
+)
+
 
 class MaterialRepository(BaseRepository[Material]):
     def __init__(self, session: AsyncSession):
@@ -15,18 +28,23 @@ class MaterialRepository(BaseRepository[Material]):
     async def get_by_id_with_relations(self, material_id: UUID) -> Optional[Material]:
         result = await self.session.execute(
             select(Material)
-            .options(
-                selectinload(Material.module).selectinload(Module.course),
-                selectinload(Material.assignment)
-            )
+            .options(*MATERIAL_DETAIL)
             .where(Material.id == material_id)
         )
         return result.scalar_one_or_none()
 
+    async def get_course_id(self, material_id: UUID) -> Optional[UUID]:
+        """Курс материала без загрузки самих объектов (для проверки доступа)"""
+        return await self.session.scalar(
+            select(Module.course_id)
+            .join(Material, Material.module_id == Module.id)
+            .where(Material.id == material_id)
+        )
+
     async def get_by_course(self, course_id: UUID) -> List[Module]:
         result = await self.session.execute(
             select(Module)
-            .options(selectinload(Module.materials))
+            .options(*COURSE_MODULES)
             .where(Module.course_id == course_id)
             .order_by(Module.order)
         )
@@ -58,19 +76,15 @@ class MaterialProgressRepository(BaseRepository[MaterialProgress]):
         progress_percent: float, 
         is_completed: bool
     ) -> MaterialProgress:
-        progress = await self.get_by_student_and_material(student_id, material_id)
-        if progress:
-            progress.progress_percent = progress_percent
-            progress.is_completed = is_completed
-            await self.session.commit()
-            await self.session.refresh(progress)
-            return progress
-        else:
-            progress = MaterialProgress(
-                student_id=student_id,
-                material_id=material_id,
-                progress_percent=progress_percent,
-                is_completed=is_completed
-            )
-            return await self.create(progress)
-
+        # Один INSERT ... ON CONFLICT вместо select-then-insert: без гонки
+        # между параллельными запросами и без лишнего round-trip
+        rows = await self.upsert(
+            [{
+                "student_id": student_id,
+                "material_id": material_id,
+                "progress_percent": progress_percent,
+                "is_completed": is_completed
+            }],
+            conflict_columns=["student_id", "material_id"]
+        )
+        return rows[0]
@@ -1,12 +1,17 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import literal_column, select, update
 from sqlalchemy.orm import selectinload
 
 from app.db.models import Notification, NotificationSettings
+from app.db.pagination import Page
 from app.repo.base import BaseRepository
 
+# Выражение буквально совпадает с индексом ix_notifications_user_course_created_id:
+# ключ - литерал, а не bind-параметр, иначе планировщик не сопоставит его с индексом
+COURSE_ID = Notification.metadata_json.op("->>")(literal_column("'course_id'"))
+
 
 class NotificationRepository(BaseRepository[Notification]):
     def __init__(self, session: AsyncSession):
@@ -15,26 +20,42 @@ class NotificationRepository(BaseRepository[Notification]):
     async def get_by_user(
         self, 
         user_id: UUID, 
-        skip: int = 0, 
-        limit: int = 50
-    ) -> List[Notification]:
-        result = await self.session.execute(
-            select(Notification)
-            .where(Notification.user_id == user_id)
-            .order_by(Notification.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-        )
-        return list(result.scalars().all())
+        cursor: Optional[str] = None, 
+        limit: int = 50,
+        course_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Page[Notification]:
+        # Новые сверху; индекс ix_notifications_user_created_id (user_id, created_at, id)
+        # или ix_notifications_user_course_created_id при фильтре по курсу.
+        # Партиции по created_at обходятся упорядоченно от новых, и LIMIT
+        # обычно закрывается свежей партицией
+        query = select(Notification).where(Notification.user_id == user_id)
+        if course_id:
+            query = query.where(COURSE_ID == str(course_id))
+        if metadata:
+            # metadata @> '{...}' - GIN-индекс ix_notifications_metadata
+            query = query.where(Notification.metadata_json.contains(metadata))
+        return await self.paginate(query, [Notification.created_at], cursor, limit)
 
     async def mark_as_read(self, notification_id: UUID, user_id: UUID) -> Optional[Notification]:
-        notification = await self.get_by_id(notification_id)
-        if notification and notification.user_id == user_id:
-            notification.is_read = True
-            await self.session.commit()
-            await self.session.refresh(notification)
-            return notification
-        return None
+        # Проверка владельца прямо в WHERE: один UPDATE ... RETURNING
+        return await self._update_where(
+            (Notification.id == notification_id) & (Notification.user_id == user_id),
+            {"is_read": True}
+        )
+
+    async def mark_all_as_read(self, user_id: UUID, course_id: Optional[UUID] = None) -> int:
+        """Пометить прочитанными все (или по курсу) уведомления одним UPDATE"""
+        stmt = (
+            update(Notification)
+            .where(Notification.user_id == user_id, Notification.is_read.is_(False))
+            .values(is_read=True)
+            .execution_options(synchronize_session=False)
+        )
+        if course_id:
+            stmt = stmt.where(COURSE_ID == str(course_id))
+        result = await self.session.execute(stmt)
+        return result.rowcount
 
 
 class NotificationSettingsRepository(BaseRepository[NotificationSettings]):
@@ -48,3 +69,5 @@ class NotificationSettingsRepository(BaseRepository[NotificationSettings]):
         )
         return result.scalar_one_or_none()
 
+    async def update_by_user_id(self, user_id: UUID, **kwargs) -> Optional[NotificationSettings]:
+        return await self._update_where(NotificationSettings.user_id == user_id, kwargs)
@@ -1,12 +1,18 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import Row, select, func
 from sqlalchemy.orm import selectinload
 
 from app.db.models import Test, TestQuestion, TestAttempt
 from app.repo.base import BaseRepository
 
+# План загрузки: структура теста - только вопросы (курс эндпоинту не нужен)
+TEST_WITH_QUESTIONS = (
+    selectinload(Test.questions),
+)
+
 
 class TestRepository(BaseRepository[Test]):
     def __init__(self, session: AsyncSession):
@@ -15,14 +21,39 @@ class TestRepository(BaseRepository[Test]):
     async def get_by_id_with_questions(self, test_id: UUID) -> Optional[Test]:
         result = await self.session.execute(
             select(Test)
-            .options(
-                selectinload(Test.course),
-                selectinload(Test.questions)
-            )
+            .options(*TEST_WITH_QUESTIONS)
             .where(Test.id == test_id)
         )
         return result.scalar_one_or_none()
 
+    async def get_questions_for_student(self, test_id: UUID) -> List[Row[Any]]:
+        """Вопросы теста без правильных ответов: варианты достаются из JSONB на стороне БД"""
+        result = await self.session.execute(
+            select(
+                TestQuestion.id,
+                TestQuestion.question_text,
+                TestQuestion.options["options"].label("options"),
+                TestQuestion.order,
+                TestQuestion.points
+            )
+            .where(TestQuestion.test_id == test_id)
+            .order_by(TestQuestion.order)
+        )
+        return list(result.all())
+
+    async def get_answer_key(self, test_id: UUID) -> List[Row[Any]]:
+        """Ключ для проверки: id, баллы и (options->>'correct')::int - без текстов вариантов"""
+        result = await self.session.execute(
+            select(
+                TestQuestion.id,
+                TestQuestion.points,
+                func.coalesce(TestQuestion.options["correct"].as_integer(), 0).label("correct")
+            )
+            .where(TestQuestion.test_id == test_id)
+            .order_by(TestQuestion.order)
+        )
+        return list(result.all())
+
     async def get_by_course(self, course_id: UUID) -> List[Test]:
         result = await self.session.execute(
             select(Test)
@@ -32,37 +63,77 @@ class TestRepository(BaseRepository[Test]):
         return list(result.scalars().all())
 
 
+    async def get_by_courses_with_deadline(
+        self,
+        course_ids: List[UUID],
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None
+    ) -> List[Test]:
+        """Тесты с дедлайном в периоде по нескольким курсам одним запросом"""
+        query = select(Test).where(
+            Test.course_id.in_(course_ids),
+            Test.deadline.is_not(None)
+        )
+        if from_date:
+            query = query.where(Test.deadline >= from_date)
+        if to_date:
+            query = query.where(Test.deadline <= to_date)
+        result = await self.session.execute(query.order_by(Test.deadline))
+        return list(result.scalars().all())
+
+
 class TestAttemptRepository(BaseRepository[TestAttempt]):
     def __init__(self, session: AsyncSession):
         super().__init__(TestAttempt, session)
 
-    async def get_best_attempt(
+    async def get_attempt_count(
         self, 
         test_id: UUID, 
         student_id: UUID
-    ) -> Optional[TestAttempt]:
+    ) -> int:
         result = await self.session.execute(
-            select(TestAttempt)
+            select(func.count(TestAttempt.id))
             .where(
                 TestAttempt.test_id == test_id,
                 TestAttempt.student_id == student_id
             )
-            .order_by(TestAttempt.score.desc())
-            .limit(1)
         )
-        return result.scalar_one_or_none()
+        return result.scalar_one() or 0
 
-    async def get_attempt_count(
-        self, 
-        test_id: UUID, 
+
+    async def get_best_attempts(
+        self,
+        test_ids: List[UUID],
         student_id: UUID
-    ) -> int:
+    ) -> Dict[UUID, TestAttempt]:
+        """Лучшая попытка студента по каждому тесту одним запросом"""
+        if not test_ids:
+            return {}
         result = await self.session.execute(
-            select(func.count(TestAttempt.id))
+            select(TestAttempt)
             .where(
-                TestAttempt.test_id == test_id,
+                TestAttempt.test_id.in_(test_ids),
                 TestAttempt.student_id == student_id
             )
+            .distinct(TestAttempt.test_id)
+            .order_by(TestAttempt.test_id, TestAttempt.score.desc())
         )
-        return result.scalar_one() or 0
+        return {attempt.test_id: attempt for attempt in result.scalars().all()}
 
+    async def get_attempt_counts(
+        self,
+        test_ids: List[UUID],
+        student_id: UUID
+    ) -> Dict[UUID, int]:
+        """Число попыток студента по каждому тесту одним запросом"""
+        if not test_ids:
+            return {}
+        result = await self.session.execute(
+            select(TestAttempt.test_id, func.count(TestAttempt.id))
+            .where(
+                TestAttempt.test_id.in_(test_ids),
+                TestAttempt.student_id == student_id
+            )
+            .group_by(TestAttempt.test_id)
+        )
+        return {test_id: count for test_id, count in result.all()}
@@ -1,11 +1,19 @@
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 
 from app.db.models import User, UserProfile, NotificationSettings
+from app.db.uow import on_commit
 from app.repo.base import BaseRepository
+from app.services.user_cache import user_cache
+
+# План загрузки: профиль и настройки уведомлений - one-to-one, один запрос с JOIN
+USER_WITH_PROFILE = (
+    joinedload(User.profile),
+    joinedload(User.notifications_settings),
+)
 
 
 class UserRepository(BaseRepository[User]):
@@ -21,7 +29,7 @@ class UserRepository(BaseRepository[User]):
     async def get_by_id_with_profile(self, user_id: UUID) -> Optional[User]:
         result = await self.session.execute(
             select(User)
-            .options(selectinload(User.profile), selectinload(User.notifications_settings))
+            .options(*USER_WITH_PROFILE)
             .where(User.id == user_id)
         )
         return result.scalar_one_or_none()
@@ -37,8 +45,19 @@ class UserRepository(BaseRepository[User]):
         self.session.add(profile)
         self.session.add(settings)
         
-        # Коммитим все изменения
-        await self.session.commit()
-        await self.session.refresh(user)
+        # created_at приходит через RETURNING, коммит - в конце запроса
+        await self.session.flush()
+        return user
+
+    async def update(self, id: UUID, **kwargs) -> Optional[User]:
+        # Любое изменение строки (профиль, пароль, роль) сбрасывает кэш снимка.
+        # Только после коммита: иначе параллельный запрос успеет закэшировать старую строку
+        user = await super().update(id, **kwargs)
+        on_commit(self.session, lambda: user_cache.invalidate(id))
         return user
 
+    async def bulk_update(self, rows) -> List[User]:
+        users = await super().bulk_update(rows)
+        for user in users:
+            on_commit(self.session, lambda user_id=user.id: user_cache.invalidate(user_id))
+        return users
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from uuid import UUID
 from typing import Optional
 
@@ -6,6 +6,7 @@ from typing import Optional
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str
+    device_id: Optional[str] = Field(None, max_length=128)  # стабильный id клиента, одна сессия на устройство
 
 
 class SignupRequest(BaseModel):
@@ -13,6 +14,7 @@ class SignupRequest(BaseModel):
     password: str
     first_name: Optional[str] = None
     last_name: Optional[str] = None
+    device_id: Optional[str] = Field(None, max_length=128)
 
 
 class TokenResponse(BaseModel):
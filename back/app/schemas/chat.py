@@ -31,7 +31,7 @@ class MessageResponse(BaseModel):
 
 class MessagesListResponse(BaseModel):
     messages: List[MessageResponse]
-    next_cursor: Optional[UUID] = None
+    next_cursor: Optional[str] = None
 
 
 class MessageCreateRequest(BaseModel):
@@ -35,4 +35,5 @@ class NotificationResponse(BaseModel):
 
 class NotificationsListResponse(BaseModel):
     notifications: list[NotificationResponse]
+    next_cursor: Optional[str] = None
 
@@ -6,9 +6,12 @@ import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import SecurityManager
+from app.core.revocation import revocation_list
 from app.core.settings import settings
 from app.core.exeptions import InvalidCredentialsException, UserAlreadyExistsException, UserNotFoundException
 from app.repo.user import UserRepository
+from app.services.password_service import password_service
+from app.services.session_store import refresh_sessions, RotationResult
 from app.db.models import User
 from app.schemas.auth import AuthResponse, UserResponse, RefreshTokenResponse
 
@@ -20,30 +23,46 @@ class AuthService:
         self.session = session
         self.user_repo = UserRepository(session)
 
-    async def login(self, email: str, password: str) -> AuthResponse:
+    @staticmethod
+    def _create_access_token(user_id: UUID) -> str:
+        return SecurityManager.create_access_token(
+            subject=str(user_id),
+            token_type="access",
+            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        )
+
+    @staticmethod
+    def _create_refresh_token(user_id: UUID, family_id: str, jti: str) -> str:
+        return SecurityManager.create_access_token(
+            subject=str(user_id),
+            token_type="refresh",
+            expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            extra_claims={"jti": jti, "fam": family_id}
+        )
+
+    async def _issue_tokens(self, user_id: UUID, device_id: Optional[str]) -> tuple[str, str]:
+        family_id, jti = await refresh_sessions.open_family(user_id, device_id)
+        return self._create_access_token(user_id), self._create_refresh_token(user_id, family_id, jti)
+
+    async def login(self, email: str, password: str, device_id: Optional[str] = None) -> AuthResponse:
         user = await self.user_repo.get_by_email(email)
         if not user:
             logger.warning("Login attempt with non-existent email", email=email)
             raise InvalidCredentialsException("Email or password is incorrect")
 
-        if not SecurityManager.verify_password(password, user.password_hash):
+        is_valid, new_hash = await password_service.verify_and_update(password, user.password_hash)
+        if not is_valid:
             logger.warning("Login attempt with wrong password", email=email)
             raise InvalidCredentialsException("Email or password is incorrect")
 
-        access_token = SecurityManager.create_access_token(
-            subject=str(user.id),
-            token_type="access",
-            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        )
-        refresh_token = SecurityManager.create_access_token(
-            subject=str(user.id),
-            token_type="refresh",
-            expires_delta=timedelta(days=30)
-        )
+        if new_hash:
+            # Хеш посчитан с устаревшей стоимостью - пересчитываем, пока знаем пароль.
+            # Пишем один раз на пользователя после смены BCRYPT_ROUNDS
+            await self.user_repo.update(user.id, password_hash=new_hash)
+            logger.info("Password rehashed with new bcrypt cost", user_id=str(user.id))
 
-        # Сохраняем refresh token
-        user.refresh_token = refresh_token
-        await self.session.commit()
+        # Refresh-сессия хранится в Redis, строку users не трогаем
+        access_token, refresh_token = await self._issue_tokens(user.id, device_id)
 
         logger.info("User logged in successfully", user_id=str(user.id), email=email)
 
@@ -53,7 +72,14 @@ class AuthService:
             user=UserResponse.model_validate(user)
         )
 
-    async def signup(self, email: str, password: str, first_name: Optional[str] = None, last_name: Optional[str] = None) -> AuthResponse:
+    async def signup(
+        self,
+        email: str,
+        password: str,
+        first_name: Optional[str] = None,
+        last_name: Optional[str] = None,
+        device_id: Optional[str] = None
+    ) -> AuthResponse:
         existing_user = await self.user_repo.get_by_email(email)
         if existing_user:
             raise UserAlreadyExistsException()
@@ -62,7 +88,7 @@ class AuthService:
         if not is_valid:
             raise InvalidCredentialsException(message)
 
-        password_hash = SecurityManager.get_password_hash(password)
+        password_hash = await password_service.hash(password)
         user = User(
             email=email,
             password_hash=password_hash,
@@ -72,19 +98,7 @@ class AuthService:
 
         user = await self.user_repo.create_with_profile(user)
 
-        access_token = SecurityManager.create_access_token(
-            subject=str(user.id),
-            token_type="access",
-            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        )
-        refresh_token = SecurityManager.create_access_token(
-            subject=str(user.id),
-            token_type="refresh",
-            expires_delta=timedelta(days=30)
-        )
-
-        user.refresh_token = refresh_token
-        await self.session.commit()
+        access_token, refresh_token = await self._issue_tokens(user.id, device_id)
 
         logger.info("User signed up successfully", user_id=str(user.id), email=email)
 
@@ -96,31 +110,43 @@ class AuthService:
 
     async def refresh_token(self, refresh_token: str) -> RefreshTokenResponse:
         payload = SecurityManager.verify_token(refresh_token, allowed_types={"refresh"})
-        if not payload:
+        if not payload or not payload.get("fam") or not payload.get("jti"):
             raise InvalidCredentialsException("Invalid refresh token")
 
         user_id = UUID(payload["sub"])
-        user = await self.user_repo.get_by_id(user_id)
-        if not user or user.refresh_token != refresh_token:
-            raise InvalidCredentialsException("Invalid refresh token")
+        family_id = payload["fam"]
 
-        access_token = SecurityManager.create_access_token(
-            subject=str(user.id),
-            token_type="access",
-            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        )
+        # Удаленному пользователю новые токены не выдаем, даже если семейство еще живо
+        if not await self.user_repo.get_by_id(user_id):
+            await refresh_sessions.revoke_all(user_id)
+            raise InvalidCredentialsException("Invalid refresh token")
 
-        # Опционально обновляем refresh token
-        new_refresh_token = SecurityManager.create_access_token(
-            subject=str(user.id),
-            token_type="refresh",
-            expires_delta=timedelta(days=30)
-        )
-        user.refresh_token = new_refresh_token
-        await self.session.commit()
+        # Ротация целиком в Redis - в Postgres ничего не пишем
+        result, new_jti = await refresh_sessions.rotate(user_id, family_id, payload["jti"])
+        if result == RotationResult.REUSED:
+            logger.warning("Refresh token reuse detected, session revoked", user_id=str(user_id), family=family_id)
+            raise InvalidCredentialsException("Refresh token has already been used")
+        if result != RotationResult.OK:
+            raise InvalidCredentialsException("Invalid refresh token")
 
         return RefreshTokenResponse(
-            access_token=access_token,
-            refresh_token=new_refresh_token
+            access_token=self._create_access_token(user_id),
+            refresh_token=self._create_refresh_token(user_id, family_id, new_jti)
         )
 
+    async def logout(self, refresh_token: str, access_payload: Optional[dict] = None) -> None:
+        # Access токен живет до exp, поэтому отзываем его явно по jti
+        if access_payload and access_payload.get("jti"):
+            await revocation_list.revoke_token(access_payload["jti"], access_payload["exp"])
+
+        payload = SecurityManager.verify_token(refresh_token, allowed_types={"refresh"})
+        if not payload or not payload.get("fam"):
+            return
+        await refresh_sessions.revoke_family(UUID(payload["sub"]), payload["fam"])
+        await revocation_list.revoke_token(payload["jti"], payload["exp"])
+        logger.info("User logged out", user_id=payload["sub"])
+
+    async def revoke_all_sessions(self, user_id: UUID) -> None:
+        """Завершает все сессии пользователя: refresh-семейства и уже выданные access токены"""
+        await refresh_sessions.revoke_all(user_id)
+        await revocation_list.revoke_user(user_id)
@@ -0,0 +1,99 @@
+"""
+Асинхронное хеширование паролей.
+
+bcrypt специально медленный (сотни миллисекунд на хеш), поэтому считать его
+прямо в обработчике нельзя: весь event loop uvicorn стоит, пока идет логин.
+Здесь работа уходит в отдельный пул процессов, а очередь ожидания ограничена,
+чтобы волна логинов не копилась в памяти бесконечно.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import structlog
+
+from app.core.exeptions import PasswordHashingBusyException
+from app.core.security import SecurityManager
+from app.core.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    # Выполняется в дочернем процессе
+    return SecurityManager.verify_password(plain_password, hashed_password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    # Выполняется в дочернем процессе
+    return SecurityManager.verify_and_update(plain_password, hashed_password)
+
+
+def hash_password(password: str) -> str:
+    """
+    Синхронный bcrypt-хеш. В обработчиках запросов - только через
+    password_service.hash; напрямую - в CLI и их собственных пулах процессов.
+    Стойкость пароля проверяет вызывающий код (SecurityManager.validate_password_strength).
+    """
+    return SecurityManager.get_password_hash(password)
+
+
+class PasswordHashService:
+    """Пул процессов для bcrypt с лимитом на глубину очереди"""
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, а не fork: форк процесса с запущенным event loop и
+            # открытыми соединениями пула БД небезопасен
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info("Password hash pool started", workers=self.max_workers)
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        """Сколько операций сейчас выполняется или ждет в очереди"""
+        return self._pending
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_workers + self.max_queue:
+            logger.warning("Password hash queue is full", pending=self._pending)
+            raise PasswordHashingBusyException()
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+        """Проверка пароля + новый хеш, если стоимость bcrypt изменилась"""
+        return await self._run(_verify_and_update, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Глобальный экземпляр сервиса
+password_service = PasswordHashService(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -0,0 +1,174 @@
+"""
+Хранилище refresh-сессий в Redis.
+
+Каждый вход с устройства открывает "семейство" refresh-токенов. В семействе
+хранится jti последнего выданного токена; при обновлении jti меняется. Если
+приходит уже использованный токен (jti не совпадает), семейство считается
+скомпрометированным и удаляется целиком.
+
+Ключи:
+    auth:rt:fam:{user_id}:{family_id} -> hash {jti, device_id}
+    auth:rt:user:{user_id}            -> hash {device_id: family_id}
+"""
+import uuid
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+import structlog
+from redis.exceptions import RedisError
+
+from app.core.cache import TTLCache
+from app.core.exeptions import SessionStoreUnavailableException
+from app.core.redis import get_redis
+from app.core.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+# Атомарная ротация: сверяем jti и сразу записываем новый
+_ROTATE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'jti')
+if not current then
+    return 0
+end
+if current ~= ARGV[1] then
+    local device = redis.call('HGET', KEYS[1], 'device_id')
+    redis.call('DEL', KEYS[1])
+    if device then
+        redis.call('HDEL', KEYS[2], device)
+    end
+    return -1
+end
+redis.call('HSET', KEYS[1], 'jti', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return 1
+"""
+
+
+class RotationResult(str, Enum):
+    OK = "ok"
+    MISSING = "missing"  # семейство истекло или отозвано
+    REUSED = "reused"  # предъявлен уже использованный токен
+
+
+class RefreshSessionStore:
+    def __init__(self):
+        # Используется только без Redis (локальная разработка, один воркер)
+        self._local = TTLCache(maxsize=100_000, ttl=self.ttl_seconds)
+
+    @property
+    def ttl_seconds(self) -> int:
+        return settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+
+    @staticmethod
+    def _family_key(user_id: UUID, family_id: str) -> str:
+        return f"auth:rt:fam:{user_id}:{family_id}"
+
+    @staticmethod
+    def _user_key(user_id: UUID) -> str:
+        return f"auth:rt:user:{user_id}"
+
+    async def open_family(self, user_id: UUID, device_id: Optional[str]) -> tuple[str, str]:
+        """
+        Открывает новое семейство для устройства и возвращает (family_id, jti).
+        Прежняя сессия того же устройства отзывается.
+        Redis недоступен - SessionStoreUnavailableException (503).
+        """
+        device_id = device_id or uuid.uuid4().hex
+        family_id = uuid.uuid4().hex
+        jti = uuid.uuid4().hex
+
+        redis = get_redis()
+        if redis is None:
+            self._local.set((user_id, family_id), {"jti": jti, "device_id": device_id})
+            return family_id, jti
+
+        user_key = self._user_key(user_id)
+        try:
+            previous = await redis.hget(user_key, device_id)
+            async with redis.pipeline(transaction=True) as pipe:
+                if previous:
+                    pipe.delete(self._family_key(user_id, previous))
+                pipe.hset(self._family_key(user_id, family_id), mapping={"jti": jti, "device_id": device_id})
+                pipe.expire(self._family_key(user_id, family_id), self.ttl_seconds)
+                pipe.hset(user_key, device_id, family_id)
+                pipe.expire(user_key, self.ttl_seconds)
+                await pipe.execute()
+        except RedisError as e:
+            # Без записи семейства refresh-токен не пройдет ротацию - выдавать его нельзя
+            logger.warning("Failed to open refresh family", error=str(e), user_id=str(user_id))
+            raise SessionStoreUnavailableException()
+        return family_id, jti
+
+    async def rotate(self, user_id: UUID, family_id: str, jti: str) -> tuple[RotationResult, Optional[str]]:
+        """Проверяет jti и заменяет его новым. Возвращает (результат, новый jti)."""
+        new_jti = uuid.uuid4().hex
+
+        redis = get_redis()
+        if redis is None:
+            family = self._local.get((user_id, family_id))
+            if family is None:
+                return RotationResult.MISSING, None
+            if family["jti"] != jti:
+                self._local.pop((user_id, family_id))
+                return RotationResult.REUSED, None
+            self._local.set((user_id, family_id), {**family, "jti": new_jti})
+            return RotationResult.OK, new_jti
+
+        try:
+            status = await redis.eval(
+                _ROTATE_SCRIPT,
+                2,
+                self._family_key(user_id, family_id),
+                self._user_key(user_id),
+                jti,
+                new_jti,
+                self.ttl_seconds,
+            )
+        except RedisError as e:
+            logger.warning("Failed to rotate refresh family", error=str(e), user_id=str(user_id))
+            raise SessionStoreUnavailableException()
+        if int(status) == 1:
+            return RotationResult.OK, new_jti
+        if int(status) == -1:
+            return RotationResult.REUSED, None
+        return RotationResult.MISSING, None
+
+    async def revoke_family(self, user_id: UUID, family_id: str) -> None:
+        redis = get_redis()
+        if redis is None:
+            self._local.pop((user_id, family_id))
+            return
+        try:
+            family_key = self._family_key(user_id, family_id)
+            device_id = await redis.hget(family_key, "device_id")
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.delete(family_key)
+                if device_id:
+                    pipe.hdel(self._user_key(user_id), device_id)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Failed to revoke refresh family", error=str(e), user_id=str(user_id))
+
+    async def revoke_all(self, user_id: UUID) -> None:
+        """Отзывает refresh-сессии пользователя на всех устройствах"""
+        redis = get_redis()
+        if redis is None:
+            for key in [k for k in self._local.keys() if k[0] == user_id]:
+                self._local.pop(key)
+            return
+        user_key = self._user_key(user_id)
+        try:
+            families = await redis.hvals(user_key)
+            async with redis.pipeline(transaction=True) as pipe:
+                for family_id in families:
+                    pipe.delete(self._family_key(user_id, family_id))
+                pipe.delete(user_key)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Failed to revoke refresh sessions", error=str(e), user_id=str(user_id))
+
+
+# Глобальный экземпляр хранилища
+refresh_sessions = RefreshSessionStore()
@@ -0,0 +1,187 @@
+"""
+Кэш снимков аутентифицированного пользователя.
+
+get_current_user вызывается на каждый запрос, а строка users меняется редко.
+Два уровня: локальный TTL/LRU в процессе воркера (короткий TTL) и Redis (общий
+для всех воркеров). Любая запись в users должна вызывать invalidate().
+
+Запрос, прочитавший строку до чужого коммита, не должен положить в кэш
+устаревший снимок уже после invalidate(). Поэтому снимок пишется только
+если поколение пользователя не изменилось с момента до чтения из БД:
+
+    generation = await user_cache.generation(user_id)
+    user = await repo.get_by_id(user_id)
+    await user_cache.set(UserSnapshot.from_user(user), generation)
+
+invalidate() увеличивает поколение в Redis (и локальный счетчик воркера).
+"""
+import json
+from dataclasses import asdict, dataclass
+from typing import Optional
+from uuid import UUID
+
+import structlog
+from redis.exceptions import RedisError
+
+from app.core.cache import TTLCache
+from app.core.redis import get_redis
+from app.core.settings import settings
+from app.db.models import User, UserRole
+
+logger = structlog.get_logger(__name__)
+
+# Снимок пишется, только если поколение не менялось с момента чтения из БД
+_SET_IF_GENERATION_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Компактный снимок пользователя без секретов (хеш пароля сюда не попадает)"""
+    id: UUID
+    email: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    role: UserRole
+    group: Optional[str]
+    university: Optional[str]
+    phone: Optional[str]
+    timezone: Optional[str]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            role=UserRole(user.role),
+            group=user.group,
+            university=user.university,
+            phone=user.phone,
+            timezone=user.timezone,
+        )
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["id"] = str(self.id)
+        data["role"] = self.role.value
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "UserSnapshot":
+        data = json.loads(raw)
+        data["id"] = UUID(data["id"])
+        data["role"] = UserRole(data["role"])
+        return cls(**data)
+
+
+@dataclass(frozen=True)
+class Generation:
+    """Поколение пользователя до чтения из БД: локальный счетчик воркера и значение в Redis"""
+    local: int
+    redis: Optional[str]  # None - Redis недоступен, в него не пишем
+
+
+class UserSnapshotCache:
+    key_prefix = "user:snapshot:"
+    generation_prefix = "user:generation:"
+    # Должно переживать любой запрос с запасом: сброс счетчика не должен совпасть с прочитанным значением
+    generation_ttl_seconds = 24 * 60 * 60
+
+    def __init__(self):
+        self._local = TTLCache(
+            maxsize=settings.USER_CACHE_LOCAL_MAXSIZE,
+            ttl=settings.USER_CACHE_LOCAL_TTL_SECONDS,
+        )
+        # Общий на воркер: любая инвалидация отменяет локальные записи начатых чтений
+        self._local_generation = 0
+
+    def _key(self, user_id: UUID) -> str:
+        return f"{self.key_prefix}{user_id}"
+
+    def _generation_key(self, user_id: UUID) -> str:
+        return f"{self.generation_prefix}{user_id}"
+
+    async def get(self, user_id: UUID) -> Optional[UserSnapshot]:
+        snapshot = self._local.get(user_id)
+        if snapshot is not None:
+            return snapshot
+
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(self._key(user_id))
+        except RedisError as e:
+            logger.warning("User cache read failed", error=str(e))
+            return None
+        if raw is None:
+            return None
+
+        snapshot = UserSnapshot.from_json(raw)
+        self._local.set(user_id, snapshot)
+        return snapshot
+
+    async def generation(self, user_id: UUID) -> Generation:
+        """Читать до запроса в БД и передать в set()"""
+        redis = get_redis()
+        if redis is None:
+            return Generation(self._local_generation, "0")
+        try:
+            value = await redis.get(self._generation_key(user_id))
+        except RedisError as e:
+            logger.warning("User cache generation read failed", error=str(e))
+            return Generation(self._local_generation, None)
+        return Generation(self._local_generation, value or "0")
+
+    async def set(self, snapshot: UserSnapshot, generation: Generation) -> None:
+        if generation.local != self._local_generation:
+            # Пока читали из БД, была инвалидация - снимок мог устареть
+            return
+        self._local.set(snapshot.id, snapshot)
+        redis = get_redis()
+        if redis is None or generation.redis is None:
+            return
+        try:
+            stored = await redis.eval(
+                _SET_IF_GENERATION_SCRIPT,
+                2,
+                self._generation_key(snapshot.id),
+                self._key(snapshot.id),
+                generation.redis,
+                snapshot.to_json(),
+                settings.USER_CACHE_REDIS_TTL_SECONDS,
+            )
+        except RedisError as e:
+            logger.warning("User cache write failed", error=str(e))
+            return
+        if not int(stored):
+            self._local.pop(snapshot.id)
+
+    async def invalidate(self, user_id: UUID) -> None:
+        self._local_generation += 1
+        self._local.pop(user_id)
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.incr(self._generation_key(user_id))
+                pipe.expire(self._generation_key(user_id), self.generation_ttl_seconds)
+                pipe.delete(self._key(user_id))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("User cache invalidation failed", error=str(e), user_id=str(user_id))
+
+    def stats(self) -> dict[str, int]:
+        return self._local.stats()
+
+
+# Глобальный экземпляр кэша
+user_cache = UserSnapshotCache()
@@ -1,11 +1,17 @@
-from fastapi import Header, HTTPException, Depends, status
+import hmac
+
+from fastapi import Header, HTTPException, Depends, Request, status
+from typing import Any, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.middleware import get_principal
 from app.core.security import SecurityManager
+from app.core.settings import settings
+from app.db.models import UserRole
 from app.repo.user import UserRepository
 from app.db.session import get_session
-from app.db.models import User
+from app.services.user_cache import UserSnapshot, user_cache
 
 def get_bearer(authorization: str = Header("")) -> str:
     """Использовать для аутентификации юзера"""
@@ -26,10 +32,16 @@ def get_bearer(authorization: str = Header("")) -> str:
     return token.strip()
 
 async def get_current_user(
-    token: str = Depends(get_bearer),
+    request: Request,
     session: AsyncSession = Depends(get_session),
-):
-    payload = SecurityManager.verify_token(token, allowed_types={"access"})
+) -> UserSnapshot:
+    # Токен уже проверен в AuthMiddleware - берем готовый payload из scope
+    principal = get_principal(request.scope)
+    if principal is not None:
+        payload = principal["token_payload"]
+    else:
+        token = get_bearer(request.headers.get("authorization", ""))
+        payload = SecurityManager.verify_token(token, allowed_types={"access"})
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -38,6 +50,12 @@ async def get_current_user(
         )
 
     user_id = UUID(payload["sub"])
+    snapshot = await user_cache.get(user_id)
+    if snapshot is not None:
+        return snapshot
+
+    # Поколение - до чтения: конкурентный update после него не даст записать устаревший снимок
+    generation = await user_cache.generation(user_id)
     repo = UserRepository(session)
     user = await repo.get_by_id(user_id)
     if not user:
@@ -47,12 +65,33 @@ async def get_current_user(
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return user
+    snapshot = UserSnapshot.from_user(user)
+    await user_cache.set(snapshot, generation)
+    return snapshot
+
+def get_optional_token_payload(request: Request) -> Optional[dict[str, Any]]:
+    """Payload access-токена, если запрос аутентифицирован, иначе None (без 401)"""
+    principal = get_principal(request.scope)
+    return principal["token_payload"] if principal else None
 
 # 3) гард по ролям
 def require_role(*allowed: str):
-    async def dep(current: User = Depends(get_current_user)):
+    async def dep(current: UserSnapshot = Depends(get_current_user)):
         if current.role.value not in allowed:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
         return current
     return dep
+
+# 4) служебные эндпоинты: сборщик метрик по общему секрету или администратор
+async def require_metrics_access(
+    request: Request,
+    x_metrics_token: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_session),
+) -> None:
+    if settings.METRICS_TOKEN and x_metrics_token and hmac.compare_digest(
+        x_metrics_token.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        return
+    current = await get_current_user(request, session)
+    if current.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
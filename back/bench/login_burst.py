@@ -0,0 +1,107 @@
+"""
+Бенчмарк: задержка посторонних GET-запросов во время волны логинов.
+
+Сначала меряет фоновую задержку GET без нагрузки, затем запускает пачку
+параллельных POST /api/auth/login и параллельно продолжает дергать GET.
+Если bcrypt блокирует event loop, p99 во время волны резко растет.
+
+Запуск (сервер уже поднят, тестовые данные созданы):
+    python bench/login_burst.py --base-url http://localhost:8001 \
+        --email student1@example.com --password student123 --logins 200
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _request(url: str, data: dict | None = None) -> float:
+    body = json.dumps(data).encode() if data is not None else None
+    req = urllib.request.Request(
+        url,
+        data=body,
+        headers={"Content-Type": "application/json"} if body else {},
+        method="POST" if body else "GET",
+    )
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            resp.read()
+    except urllib.error.HTTPError as e:
+        e.read()
+    return (time.perf_counter() - started) * 1000
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _report(name: str, latencies: list[float]) -> None:
+    if not latencies:
+        print(f"{name}: нет данных")
+        return
+    print(
+        f"{name}: n={len(latencies)} "
+        f"p50={statistics.median(latencies):.1f}ms "
+        f"p99={_percentile(latencies, 99):.1f}ms "
+        f"max={max(latencies):.1f}ms"
+    )
+
+
+def _probe(url: str, stop: threading.Event, interval: float) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        latencies.append(_request(url))
+        time.sleep(interval)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--email", default="student1@example.com")
+    parser.add_argument("--password", default="student123")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--probe-path", default="/ping")
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    parser.add_argument("--baseline-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    probe_url = args.base_url.rstrip("/") + args.probe_path
+    login_url = args.base_url.rstrip("/") + "/api/auth/login"
+    credentials = {"email": args.email, "password": args.password}
+
+    # 1. Фон без нагрузки
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as probe_pool:
+        future = probe_pool.submit(_probe, probe_url, stop, args.probe_interval)
+        time.sleep(args.baseline_seconds)
+        stop.set()
+        baseline = future.result()
+
+    # 2. GET во время волны логинов
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as probe_pool:
+        future = probe_pool.submit(_probe, probe_url, stop, args.probe_interval)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as login_pool:
+            login_latencies = list(login_pool.map(lambda _: _request(login_url, credentials), range(args.logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        during_burst = future.result()
+
+    _report(f"GET {args.probe_path} без нагрузки", baseline)
+    _report(f"GET {args.probe_path} во время логинов", during_burst)
+    _report("POST /api/auth/login", login_latencies)
+    print(f"Пропускная способность логина: {args.logins / elapsed:.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
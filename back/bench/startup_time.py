@@ -0,0 +1,77 @@
+"""
+Бенчмарк: холодный старт воркера - импорт приложения и startup в lifespan.
+
+Каждый замер - отдельный процесс (как новый воркер uvicorn): время импорта
+app.main, время до готовности (выход из startup-части lifespan) и число
+SQL-запросов за это время. --legacy добавляет в startup прежнюю загрузку
+демо-данных (init_test_data на уже заполненной базе - обычный перезапуск),
+так что один прогон с ним и один без него дают сравнение до/после.
+Нужны БД с примененными миграциями и Redis (настройки из .env).
+
+Запуск из каталога back/:
+    python bench/startup_time.py --runs 10
+    python bench/startup_time.py --runs 10 --legacy
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def measure_once(legacy: bool) -> dict:
+    started = time.perf_counter()
+    from app.main import app, lifespan
+    from app.db.query_stats import collect_queries
+    imported = time.perf_counter()
+
+    with collect_queries() as stats:
+        ready_started = time.perf_counter()
+        async with lifespan(app):
+            if legacy:
+                from app.db.init_data import init_test_data
+                await init_test_data()
+            ready = time.perf_counter()
+    return {
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (ready - ready_started) * 1000,
+        "queries": stats.count,
+    }
+
+
+def run(runs: int, legacy: bool) -> None:
+    command = [sys.executable, os.path.abspath(__file__), "--once"] + (["--legacy"] if legacy else [])
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'mode':<10} {'import ms':>10} {'startup ms':>11} {'sql':>6}")
+    print(
+        f"{'legacy' if legacy else 'current':<10} "
+        f"{statistics.median(r['import_ms'] for r in results):>10.1f} "
+        f"{statistics.median(r['startup_ms'] for r in results):>11.1f} "
+        f"{statistics.median(r['queries'] for r in results):>6.0f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Worker cold start: import + lifespan startup time")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--legacy", action="store_true", help="also seed demo data on startup, as before")
+    parser.add_argument("--once", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.once:
+        # Последняя строка stdout - результат для родительского процесса
+        print(json.dumps(asyncio.run(measure_once(args.legacy))))
+    else:
+        run(args.runs, args.legacy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Бенчмарк: число запросов и задержка на обновление профиля и настроек уведомлений.
+
+Сравнивает прежний путь записи (UPDATE + COMMIT + SELECT; для настроек еще
+предварительный SELECT по user_id) с текущим UPDATE ... RETURNING через
+репозитории. Нужна БД с примененными миграциями (настройки из .env);
+создается и затем удаляется временный пользователь.
+
+Запуск из каталога back/:
+    python bench/write_roundtrips.py --iterations 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, select, update  # noqa: E402
+
+from app.db import uow  # noqa: E402
+from app.db.models import NotificationSettings, User, UserProfile  # noqa: E402
+from app.db.query_stats import collect_queries  # noqa: E402
+from app.db.session import AsyncSessionLocal, engine  # noqa: E402
+from app.repo.notification import NotificationSettingsRepository  # noqa: E402
+from app.repo.user import UserRepository  # noqa: E402
+
+
+async def legacy_profile_update(session, user_id, **values):
+    await session.execute(update(User).where(User.id == user_id).values(**values))
+    await session.commit()
+    result = await session.execute(select(User).where(User.id == user_id))
+    return result.scalar_one_or_none()
+
+
+async def legacy_settings_update(session, user_id, **values):
+    result = await session.execute(select(NotificationSettings).where(NotificationSettings.user_id == user_id))
+    settings = result.scalar_one()
+    await session.execute(update(NotificationSettings).where(NotificationSettings.id == settings.id).values(**values))
+    await session.commit()
+    result = await session.execute(select(NotificationSettings).where(NotificationSettings.id == settings.id))
+    return result.scalar_one_or_none()
+
+
+async def current_profile_update(session, user_id, **values):
+    user = await UserRepository(session).update(user_id, **values)
+    await uow.commit(session)
+    return user
+
+
+async def current_settings_update(session, user_id, **values):
+    settings = await NotificationSettingsRepository(session).update_by_user_id(user_id, **values)
+    await uow.commit(session)
+    return settings
+
+
+async def measure(name, fn, user_id, iterations, make_values):
+    queries = []
+    timings = []
+    for i in range(iterations):
+        async with AsyncSessionLocal() as session:
+            with collect_queries() as stats:
+                started = time.perf_counter()
+                await fn(session, user_id, **make_values(i))
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(stats.count)
+    # Считаются SQL-запросы; BEGIN/COMMIT asyncpg выполняет мимо курсора
+    per_op = statistics.mean(queries)
+    print(
+        f"{name:<26} {per_op:>8.1f} {statistics.median(timings):>10.2f} "
+        f"{sorted(timings)[int(len(timings) * 0.99) - 1]:>10.2f}"
+    )
+    return per_op
+
+
+async def run(iterations: int) -> None:
+    async with AsyncSessionLocal() as session:
+        user = await UserRepository(session).create_with_profile(User(
+            email=f"bench-{uuid.uuid4().hex[:12]}@example.com",
+            password_hash="x",
+            first_name="Bench",
+        ))
+        user_id = user.id
+        await uow.commit(session)
+
+    profile_values = lambda i: {"first_name": f"Bench {i}"}  # noqa: E731
+    settings_values = lambda i: {"reminder_days_before": i % 7 + 1}  # noqa: E731
+
+    print(f"{'path':<26} {'sql/op':>8} {'p50 ms':>10} {'p99 ms':>10}")
+    try:
+        results = {}
+        for name, fn, values in (
+            ("profile: legacy", legacy_profile_update, profile_values),
+            ("profile: RETURNING", current_profile_update, profile_values),
+            ("settings: legacy", legacy_settings_update, settings_values),
+            ("settings: RETURNING", current_settings_update, settings_values),
+        ):
+            results[name] = await measure(name, fn, user_id, iterations, values)
+        print(
+            f"\nSQL statements per update: profile {results['profile: legacy']:.0f} -> {results['profile: RETURNING']:.0f}, "
+            f"settings {results['settings: legacy']:.0f} -> {results['settings: RETURNING']:.0f}"
+        )
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(NotificationSettings).where(NotificationSettings.user_id == user_id))
+            await session.execute(delete(UserProfile).where(UserProfile.user_id == user_id))
+            await session.execute(delete(User).where(User.id == user_id))
+            await session.commit()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Round-trips per profile/settings update")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Начальная схема (то, что раньше создавал create_all при старте)
+
+Для базы, уже созданной через create_all, эту ревизию не применяют,
+а отмечают: alembic stamp 0001_initial_schema
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001_initial_schema"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# SQLAlchemy хранит в enum-типах имена членов Python-enum
+user_role = sa.Enum("STUDENT", "TEACHER", "ADMIN", name="userrole")
+course_status = sa.Enum("ACTIVE", "COMPLETED", "ARCHIVED", name="coursestatus")
+material_type = sa.Enum("VIDEO", "TEXT", "FILE", "SCORM", name="materialtype")
+assignment_status = sa.Enum("NOT_STARTED", "IN_PROGRESS", "SUBMITTED", "GRADED", "OVERDUE", name="assignmentstatus")
+notification_type = sa.Enum(
+    "ASSIGNMENT_GRADED", "TEST_GRADED", "DEADLINE_REMINDER", "COMMENT_ADDED", "COURSE_ANNOUNCEMENT",
+    name="notificationtype",
+)
+
+
+def _id() -> sa.Column:
+    return sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True)
+
+
+def _fk(name: str, target: str, nullable: bool = False) -> sa.Column:
+    return sa.Column(name, postgresql.UUID(as_uuid=True), sa.ForeignKey(target), nullable=nullable)
+
+
+def _timestamp(name: str) -> sa.Column:
+    return sa.Column(name, sa.DateTime(timezone=True), server_default=sa.func.now())
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        _id(),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("first_name", sa.String(100)),
+        sa.Column("last_name", sa.String(100)),
+        sa.Column("role", user_role),
+        sa.Column("group", sa.String(100)),
+        sa.Column("university", sa.String(255)),
+        sa.Column("phone", sa.String(50)),
+        sa.Column("timezone", sa.String(50)),
+        _timestamp("created_at"),
+        _timestamp("updated_at"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "user_profiles",
+        _id(),
+        _fk("user_id", "users.id"),
+        sa.Column("bio", sa.Text),
+        sa.Column("avatar_url", sa.String(500)),
+        _timestamp("created_at"),
+        _timestamp("updated_at"),
+        sa.UniqueConstraint("user_id"),
+    )
+
+    op.create_table(
+        "notification_settings",
+        _id(),
+        _fk("user_id", "users.id"),
+        sa.Column("email_assignment_graded", sa.Boolean),
+        sa.Column("email_test_graded", sa.Boolean),
+        sa.Column("email_deadline_reminder", sa.Boolean),
+        sa.Column("email_comment_added", sa.Boolean),
+        sa.Column("email_course_announcement", sa.Boolean),
+        sa.Column("reminder_days_before", sa.Integer),
+        _timestamp("created_at"),
+        _timestamp("updated_at"),
+        sa.UniqueConstraint("user_id"),
+    )
+
+    op.create_table(
+        "courses",
+        _id(),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text),
+        _fk("teacher_id", "users.id"),
+        sa.Column("status", course_status),
+        _timestamp("created_at"),
+        _timestamp("updated_at"),
+    )
+
+    op.create_table(
+        "student_courses",
+        _id(),
+        _fk("student_id", "users.id"),
+        _fk("course_id", "courses.id"),
+        sa.Column("progress", sa.Float),
+        sa.Column("status", course_status),
+        _timestamp("enrolled_at"),
+        sa.Column("completed_at", sa.DateTime(timezone=True)),
+    )
+
+    op.create_table(
+        "modules",
+        _id(),
+        _fk("course_id", "courses.id"),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("order", sa.Integer, nullable=False),
+        _timestamp("created_at"),
+    )
+
+    op.create_table(
+        "materials",
+        _id(),
+        _fk("module_id", "modules.id"),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("type", material_type, nullable=False),
+        sa.Column("content_url", sa.String(500)),
+        sa.Column("content_text", sa.Text),
+        sa.Column("order", sa.Integer, nullable=False),
+        _timestamp("created_at"),
+    )
+
+    op.create_table(
+        "material_progress",
+        _id(),
+        _fk("student_id", "users.id"),
+        _fk("material_id", "materials.id"),
+        sa.Column("progress_percent", sa.Float),
+        sa.Column("is_completed", sa.Boolean),
+        _timestamp("updated_at"),
+    )
+
+    op.create_table(
+        "assignments",
+        _id(),
+        _fk("course_id", "courses.id"),
+        _fk("material_id", "materials.id", nullable=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("max_score", sa.Float),
+        sa.Column("deadline", sa.DateTime(timezone=True)),
+        _timestamp("created_at"),
+        _timestamp("updated_at"),
+    )
+
+    op.create_table(
+        "submissions",
+        _id(),
+        _fk("assignment_id", "assignments.id"),
+        _fk("student_id", "users.id"),
+        sa.Column("comment", sa.Text),
+        sa.Column("score", sa.Float),
+        sa.Column("teacher_comment", sa.Text),
+        sa.Column("status", assignment_status),
+        _timestamp("submitted_at"),
+        sa.Column("graded_at", sa.DateTime(timezone=True)),
+    )
+
+    op.create_table(
+        "submission_files",
+        _id(),
+        _fk("submission_id", "submissions.id"),
+        sa.Column("file_url", sa.String(500), nullable=False),
+        sa.Column("file_name", sa.String(255), nullable=False),
+        sa.Column("file_size", sa.Integer),
+        _timestamp("uploaded_at"),
+    )
+
+    op.create_table(
+        "tests",
+        _id(),
+        _fk("course_id", "courses.id"),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("max_attempts", sa.Integer),
+        sa.Column("time_limit_minutes", sa.Integer),
+        sa.Column("deadline", sa.DateTime(timezone=True)),
+        _timestamp("created_at"),
+    )
+
+    op.create_table(
+        "test_questions",
+        _id(),
+        _fk("test_id", "tests.id"),
+        sa.Column("question_text", sa.Text, nullable=False),
+        sa.Column("options", sa.JSON, nullable=False),
+        sa.Column("order", sa.Integer, nullable=False),
+        sa.Column("points", sa.Float),
+    )
+
+    op.create_table(
+        "test_attempts",
+        _id(),
+        _fk("test_id", "tests.id"),
+        _fk("student_id", "users.id"),
+        sa.Column("answers", sa.JSON, nullable=False),
+        sa.Column("score", sa.Float),
+        sa.Column("max_score", sa.Float),
+        sa.Column("is_passed", sa.Boolean),
+        _timestamp("started_at"),
+        sa.Column("completed_at", sa.DateTime(timezone=True)),
+    )
+
+    op.create_table(
+        "chat_channels",
+        _id(),
+        _fk("course_id", "courses.id"),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text),
+        _timestamp("created_at"),
+    )
+
+    op.create_table(
+        "messages",
+        _id(),
+        _fk("channel_id", "chat_channels.id"),
+        _fk("sender_id", "users.id"),
+        sa.Column("content", sa.Text, nullable=False),
+        _timestamp("created_at"),
+    )
+
+    op.create_table(
+        "notifications",
+        _id(),
+        _fk("user_id", "users.id"),
+        sa.Column("type", notification_type, nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("message", sa.Text, nullable=False),
+        sa.Column("is_read", sa.Boolean),
+        sa.Column("metadata", sa.JSON),
+        _timestamp("created_at"),
+    )
+
+
+def downgrade() -> None:
+    for table in (
+        "notifications", "messages", "chat_channels", "test_attempts", "test_questions", "tests",
+        "submission_files", "submissions", "assignments", "material_progress", "materials", "modules",
+        "student_courses", "courses", "notification_settings", "user_profiles", "users",
+    ):
+        op.drop_table(table)
+    for enum in (notification_type, assignment_status, material_type, course_status, user_role):
+        enum.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,22 @@
+"""Удаление users.refresh_token (refresh-сессии живут в Redis)
+
+Revision ID: 0002_drop_users_refresh_token
+Revises: 0001_initial_schema
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_drop_users_refresh_token"
+down_revision = "0001_initial_schema"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Колонка есть только в базах, созданных create_all до переноса сессий в Redis
+    op.execute("ALTER TABLE users DROP COLUMN IF EXISTS refresh_token")
+
+
+def downgrade() -> None:
+    op.add_column("users", sa.Column("refresh_token", sa.String(500)))
@@ -0,0 +1,77 @@
+"""Индексы для горячих запросов
+
+Строятся через CREATE INDEX CONCURRENTLY, чтобы не блокировать запись
+в большие таблицы на время миграции.
+
+Revision ID: 0003_hot_path_indexes
+Revises: 0002_drop_users_refresh_token
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_hot_path_indexes"
+down_revision = "0002_drop_users_refresh_token"
+branch_labels = None
+depends_on = None
+
+# (имя, таблица, колонки, unique)
+INDEXES = [
+    ("uq_student_courses_student_course", "student_courses", "student_id, course_id", True),
+    ("ix_student_courses_course_id", "student_courses", "course_id", False),
+    ("ix_submissions_assignment_student_submitted", "submissions", "assignment_id, student_id, submitted_at", False),
+    ("ix_messages_channel_created", "messages", "channel_id, created_at", False),
+    ("ix_notifications_user_created", "notifications", "user_id, created_at", False),
+    ("ix_test_attempts_test_student", "test_attempts", "test_id, student_id", False),
+    ("uq_material_progress_student_material", "material_progress", "student_id, material_id", True),
+]
+
+
+def _drop_if_invalid(name: str) -> None:
+    # Прерванный CREATE INDEX CONCURRENTLY оставляет INVALID индекс,
+    # и IF NOT EXISTS его бы пропустил - удаляем и строим заново
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+# Уникальные индексы не построятся на дублях, которые могла оставить
+# гонка "select, затем insert" - оставляем по одной строке на пару
+DEDUPLICATE = [
+    """
+    DELETE FROM student_courses sc USING student_courses dup
+    WHERE sc.student_id = dup.student_id AND sc.course_id = dup.course_id
+      AND (coalesce(sc.enrolled_at, 'infinity'), sc.id) > (coalesce(dup.enrolled_at, 'infinity'), dup.id)
+    """,
+    """
+    DELETE FROM material_progress mp USING material_progress dup
+    WHERE mp.student_id = dup.student_id AND mp.material_id = dup.material_id
+      AND (coalesce(mp.progress_percent, 0), coalesce(mp.updated_at, '-infinity'), mp.id)
+        < (coalesce(dup.progress_percent, 0), coalesce(dup.updated_at, '-infinity'), dup.id)
+    """,
+]
+
+
+def upgrade() -> None:
+    for statement in DEDUPLICATE:
+        op.execute(statement)
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            _drop_if_invalid(name)
+            op.execute(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} ({columns})"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, *_ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,70 @@
+"""Индексы и NOT NULL для keyset-пагинации сообщений и уведомлений
+
+Лента сообщений и уведомлений листается по (created_at, id), поэтому:
+- created_at становится NOT NULL (через CHECK NOT VALID + VALIDATE, чтобы
+  не держать ACCESS EXCLUSIVE на время проверки всей таблицы);
+- индексы (channel_id|user_id, created_at) заменяются на (..., created_at, id).
+
+Revision ID: 0004_keyset_pagination
+Revises: 0003_hot_path_indexes
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_keyset_pagination"
+down_revision = "0003_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+TABLES = ["messages", "notifications"]
+
+# (новый индекс, старый индекс, таблица, колонки)
+INDEXES = [
+    ("ix_messages_channel_created_id", "ix_messages_channel_created", "messages", "channel_id, created_at, id"),
+    ("ix_notifications_user_created_id", "ix_notifications_user_created", "notifications", "user_id, created_at, id"),
+]
+
+
+def _drop_if_invalid(name: str) -> None:
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def upgrade() -> None:
+    # Каждый шаг - в своей транзакции: иначе блокировка от ADD CONSTRAINT
+    # держалась бы и во время VALIDATE
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {table}_created_at_not_null "
+                f"CHECK (created_at IS NOT NULL) NOT VALID"
+            )
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_created_at_not_null")
+            # При валидном CHECK Postgres не сканирует таблицу повторно
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL")
+            op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {table}_created_at_not_null")
+
+        for name, old_name, table, columns in INDEXES:
+            _drop_if_invalid(name)
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {old_name}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, old_name, table, columns in reversed(INDEXES):
+            old_columns = columns.rsplit(", ", 1)[0]
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {old_name} ON {table} ({old_columns})")
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+    for table in reversed(TABLES):
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at DROP NOT NULL")
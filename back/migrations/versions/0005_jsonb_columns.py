@@ -0,0 +1,67 @@
+"""JSON -> JSONB для вопросов, попыток и metadata уведомлений; индексы по metadata
+
+ALTER COLUMN TYPE переписывает таблицу под ACCESS EXCLUSIVE - на больших
+notifications миграцию стоит запускать в окно низкой нагрузки. Индексы
+строятся CONCURRENTLY.
+
+Revision ID: 0005_jsonb_columns
+Revises: 0004_keyset_pagination
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_jsonb_columns"
+down_revision = "0004_keyset_pagination"
+branch_labels = None
+depends_on = None
+
+# (таблица, колонка)
+COLUMNS = [
+    ("test_questions", "options"),
+    ("test_attempts", "answers"),
+    ("notifications", "metadata"),
+]
+
+# (имя, определение)
+INDEXES = [
+    (
+        "ix_notifications_user_course_created_id",
+        "ON notifications (user_id, (metadata ->> 'course_id'), created_at, id)",
+    ),
+    (
+        "ix_notifications_metadata",
+        "ON notifications USING gin (metadata jsonb_path_ops)",
+    ),
+]
+
+
+def _drop_if_invalid(name: str) -> None:
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def upgrade() -> None:
+    for table, column in COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN "{column}" TYPE jsonb USING "{column}"::jsonb')
+
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES:
+            _drop_if_invalid(name)
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+    for table, column in reversed(COLUMNS):
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN "{column}" TYPE json USING "{column}"::json')
@@ -0,0 +1,106 @@
+"""Помесячное партиционирование messages и notifications по created_at
+
+Таблицы пересоздаются как PARTITION BY RANGE (created_at) с первичным ключом
+(id, created_at), данные копируются в партиции. Миграция переписывает обе
+таблицы под ACCESS EXCLUSIVE - на больших объемах ее запускают с
+остановленным приложением. Дальнейшие партиции создает app.db.partitions.
+
+Revision ID: 0006_partition_messages_notifications
+Revises: 0005_jsonb_columns
+Create Date: 2026-10-16
+"""
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_partition_messages_notifications"
+down_revision = "0005_jsonb_columns"
+branch_labels = None
+depends_on = None
+
+# Столько месяцев вперед создаем сразу (как PARTITION_PREMAKE_MONTHS по умолчанию)
+PREMAKE_MONTHS = 3
+
+TABLES = {
+    "messages": {
+        "foreign_keys": [("channel_id", "chat_channels"), ("sender_id", "users")],
+        "indexes": [
+            ("ix_messages_channel_created_id", "(channel_id, created_at, id)"),
+        ],
+    },
+    "notifications": {
+        "foreign_keys": [("user_id", "users")],
+        "indexes": [
+            ("ix_notifications_user_created_id", "(user_id, created_at, id)"),
+            ("ix_notifications_user_course_created_id", "(user_id, (metadata ->> 'course_id'), created_at, id)"),
+            ("ix_notifications_metadata", "USING gin (metadata jsonb_path_ops)"),
+        ],
+    },
+}
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _months(table: str) -> list[date]:
+    """Месяцы, которые покрывают существующие строки и PREMAKE_MONTHS вперед"""
+    oldest, newest = op.get_bind().execute(
+        sa.text(f"SELECT min(created_at), max(created_at) FROM {table}_unpartitioned")
+    ).one()
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    first = oldest.astimezone(timezone.utc).date().replace(day=1) if oldest else current
+    last = max(_add_months(current, PREMAKE_MONTHS), newest.astimezone(timezone.utc).date().replace(day=1) if newest else current)
+    months = []
+    month = first
+    while month <= last:
+        months.append(month)
+        month = _add_months(month, 1)
+    return months
+
+
+def _rebuild(table: str, partitioned: bool) -> None:
+    spec = TABLES[table]
+    old = f"{table}_unpartitioned" if partitioned else f"{table}_partitioned"
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    op.execute(f"ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey")
+
+    if partitioned:
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE (created_at)"
+        )
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)")
+        for month in _months(table):
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{_add_months(month, 1)} 00:00:00+00')"
+            )
+    else:
+        op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)")
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    # Вместе со старой таблицей уходят ее индексы, внешние ключи и (при откате) партиции
+    op.execute(f"DROP TABLE {old} CASCADE")
+
+    for column, target in spec["foreign_keys"]:
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey "
+            f"FOREIGN KEY ({column}) REFERENCES {target} (id)"
+        )
+    for name, definition in spec["indexes"]:
+        op.execute(f"CREATE INDEX {name} ON {table} {definition}")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        _rebuild(table, partitioned=True)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        _rebuild(table, partitioned=False)
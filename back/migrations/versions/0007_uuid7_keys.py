@@ -0,0 +1,52 @@
+"""UUIDv7 для таблиц с интенсивной вставкой: функция uuid7_at
+
+Новые строки messages, notifications, submissions, test_attempts и
+material_progress получают UUIDv7 из приложения (app/db/ids.py).
+Существующие строки миграция не трогает: переписать все первичные ключи
+одним UPDATE - значит заблокировать таблицы и записать новую версию каждой
+строки, а id уведомлений, которые уже есть у клиентов, перестали бы
+находиться. Старые uuid4 остаются валидными ключами, растущими будут только
+новые - так же, как в submissions.
+
+Здесь создается только uuid7_at(timestamptz) для необязательного
+перевыпуска ключей старых строк пачками: python -m app.cli.rekey_uuid7.
+
+Revision ID: 0007_uuid7_keys
+Revises: 0006_partition_messages_notifications
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0007_uuid7_keys"
+down_revision = "0006_partition_messages_notifications"
+branch_labels = None
+depends_on = None
+
+# UUIDv7 от заданного времени: 48 бит миллисекунд поверх gen_random_uuid(),
+# версия 4 -> 7 установкой двух битов (встроенная uuidv7() есть только с Postgres 18)
+UUID7_AT_SQL = """
+CREATE OR REPLACE FUNCTION uuid7_at(ts timestamptz) RETURNS uuid AS $$
+    SELECT encode(
+        set_bit(
+            set_bit(
+                overlay(
+                    uuid_send(gen_random_uuid())
+                    PLACING substring(int8send(floor(extract(epoch FROM ts) * 1000)::bigint) FROM 3)
+                    FROM 1 FOR 6
+                ),
+                52, 1
+            ),
+            53, 1
+        ),
+        'hex'
+    )::uuid
+$$ LANGUAGE sql VOLATILE
+"""
+
+
+def upgrade() -> None:
+    op.execute(UUID7_AT_SQL)
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS uuid7_at(timestamptz)")
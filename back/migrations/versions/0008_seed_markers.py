@@ -0,0 +1,30 @@
+"""Таблица seed_markers: какие наборы начальных данных уже загружены
+
+Демо-данные больше не создаются при старте приложения, их загружает
+python -m app.cli.seed. Команда идемпотентна: строка в seed_markers
+(имя набора и версия) - единственная проверка, нужна ли загрузка.
+
+Revision ID: 0008_seed_markers
+Revises: 0007_uuid7_keys
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_seed_markers"
+down_revision = "0007_uuid7_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "seed_markers",
+        sa.Column("name", sa.String(100), primary_key=True),
+        sa.Column("version", sa.Integer, nullable=False),
+        sa.Column("applied_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("seed_markers")